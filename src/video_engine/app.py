@@ -6,8 +6,9 @@ clip (MVP behavior).
 """
 from __future__ import annotations
 
+import re
 from pathlib import Path
-from typing import Optional, List
+from typing import List
 
 from .presets import DEFAULTS
 from .scan import (
@@ -15,26 +16,20 @@ from .scan import (
     ScanReport,
     build_no_media_message,
     build_scan_summary_lines,
+    choose_bgm,
     scan_media_with_report,
 )
 from .timeline import build_timeline
-from .render import render_single_photo
+from .render import render_single_photo, render_timeline
 
 
-def _sanitize_week(iso_week: str) -> str:
-    # Keep only safe characters
-    return "".join(c if c.isalnum() or c in "-_." else "_" for c in iso_week)
+# Anything but word characters (Unicode alnum + "_"), "-" and "." becomes "_"
+_UNSAFE_NAME_RE = re.compile(r"[^\w.-]")
 
 
-def _choose_bgm(bgm_path: Path | None) -> Optional[Path]:
-    if bgm_path is None:
-        return None
-    if bgm_path.is_file():
-        return bgm_path
-    if bgm_path.is_dir():
-        files = sorted([p for p in bgm_path.iterdir() if p.is_file()])
-        return files[0] if files else None
-    return None
+def _sanitize_week(iso_week: str) -> str:
+    # Keep only safe characters
+    return _UNSAFE_NAME_RE.sub("_", iso_week)
 
 
 def run_e2e(
@@ -58,6 +53,7 @@ def run_e2e(
     scan_all_flag: bool = False,
     pre_scanned: List[MediaItem] | None = None,
     scan_report: ScanReport | None = None,
+    encoder_preset: str | None = None,
 ) -> int:
     """Run a minimal end-to-end preview creation for the given ISO week.
 
@@ -95,11 +91,9 @@ def run_e2e(
     else:
         out_path = output_dir / f"{input_dir.name}_preview.mp4"
 
-    bgm_choice = _choose_bgm(bgm)
+    bgm_choice = choose_bgm(bgm)
 
     # Render full timeline by concatenating the planned clips
-    from .render import render_timeline
-
     render_timeline(
         plans,
         out_path,
@@ -113,6 +107,8 @@ def run_e2e(
         bg_blur=bg_blur,
         bgm_volume=bgm_volume,
         resolution=resolution,
+        cache_dir=output_dir / ".cache",
+        encoder_preset=encoder_preset,
     )
 
     print(f"Wrote preview: {out_path}")
@@ -1,52 +1,127 @@
-
-from __future__ import annotations
-import re
 """Command-line interface for the video_engine package.
 
 This module provides a minimal, extensible argparse-based CLI skeleton
 with a `build_parser()` factory and `main()` entry point.
 """
 
+from __future__ import annotations
+
 import argparse
+import functools
 from pathlib import Path
 import sys
 from typing import List, Optional
 
-import yaml
+from .presets import DEFAULTS, ENCODER_PRESETS
+
+
+def _parse_resolution(s):
+    if s is None:
+        return None
+    # Imported here so --help does not pull in the config module
+    from .config import parse_resolution_str
+
+    try:
+        return parse_resolution_str(s)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"--{exc}") from exc
+
 
+def _parse_scan_limit(value: str) -> int:
+    try:
+        v = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("--scan-limit must be an integer") from exc
+    if v < 0:
+        raise argparse.ArgumentTypeError("--scan-limit must be >= 0")
+    return v
 
+
+class _ValidatingAction(argparse.Action):
+    """Store an option value after running it through `validate`."""
+
+    validate = staticmethod(lambda value: value)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            value = self.validate(values)
+        except argparse.ArgumentTypeError as exc:
+            raise argparse.ArgumentError(self, str(exc)) from exc
+        setattr(namespace, self.dest, value)
+
+
+class _ResolutionAction(_ValidatingAction):
+    validate = staticmethod(_parse_resolution)
+
+
+class _ScanLimitAction(_ValidatingAction):
+    validate = staticmethod(_parse_scan_limit)
+
+
+# Values for options not given on the command line, keyed by dest
+_ARG_DEFAULTS = {
+    "resolution": None,
+    "preset": None,
+    "config": None,
+    "print_config": False,
+    "config_format": "yaml",
+    "name": None,
+    "input": Path("./input"),
+    "bgm": Path("./bgm"),
+    "output": Path("./output"),
+    "duration": float(DEFAULTS["duration"]),
+    "photo_seconds": float(DEFAULTS["photo_seconds"]),
+    "video_max_seconds": float(DEFAULTS["video_max_seconds"]),
+    "photo_max_seconds": float(DEFAULTS["photo_max_seconds"]),
+    "timeline_mode": str(DEFAULTS["timeline_mode"]),
+    "video_weight": float(DEFAULTS["video_weight"]),
+    "transition": float(DEFAULTS["transition"]),
+    "fade_max_ratio": float(DEFAULTS["fade_max_ratio"]),
+    "fps": int(DEFAULTS["fps"]),
+    "preserve_videos": False,
+    "scan_all": False,
+    "verbose_scan": False,
+    "scan_limit": 20,
+    "dry_run": False,
+    "bg_blur": float(DEFAULTS["bg_blur"]),
+    "bgm_volume": float(DEFAULTS["bgm_volume"]),
+}
+
+
+# Help strings that quote a default, rendered once at import
+_HELP_TEXT = {
+    "duration": f"Duration in seconds for the preview video (default: {_ARG_DEFAULTS['duration']})",
+    "photo_seconds": f"Base duration per photo clip (default: {_ARG_DEFAULTS['photo_seconds']})",
+    "video_max_seconds": f"Max duration per video clip (default: {_ARG_DEFAULTS['video_max_seconds']})",
+    "photo_max_seconds": f"Max duration per photo clip when distributing time (default: {_ARG_DEFAULTS['photo_max_seconds']})",
+    "video_weight": f"Weight multiplier for videos in weighted mode (default: {_ARG_DEFAULTS['video_weight']})",
+    "transition": f"Per-clip transition length in seconds (fade-in/out, default: {_ARG_DEFAULTS['transition']}). Set 0 to disable.",
+    "fade_max_ratio": f"Max fade duration as a ratio of clip length (default: {_ARG_DEFAULTS['fade_max_ratio']} = no cap).",
+    "fps": f"Frames per second for output video (default: {_ARG_DEFAULTS['fps']})",
+    "bg_blur": f"Blur radius for background of portrait photos (default: {_ARG_DEFAULTS['bg_blur']}, set 0 to disable)",
+    "bgm_volume": f"BGM volume level as percentage of original video audio (default: {_ARG_DEFAULTS['bgm_volume']}, range: 0-200)",
+}
+
+
+@functools.lru_cache(maxsize=1)
 def build_parser() -> argparse.ArgumentParser:
-    from .presets import DEFAULTS
-
-    def parse_resolution(s):
-        if s is None:
-            return None
-        m = re.match(r"^(\d{2,5})x(\d{2,5})$", s)
-        if not m:
-            raise argparse.ArgumentTypeError("--resolution must be in WIDTHxHEIGHT format, e.g. 1920x1080")
-        w, h = int(m.group(1)), int(m.group(2))
-        if w < 320 or h < 240 or w > 8192 or h > 4320:
-            raise argparse.ArgumentTypeError("--resolution values out of supported range (min 320x240, max 8192x4320)")
-        return (w, h)
+    """Return the CLI parser.
 
+    The parser holds no per-invocation state, so it is built once and
+    reused by every `main()` call; use `build_parser.cache_clear()` to
+    force a rebuild.
+    """
     parser = argparse.ArgumentParser(
         prog="video_engine",
         description="Weekly slideshow engine (skeleton CLI).",
+        # Omitted options stay off the namespace, which is how main() tells
+        # explicit flags from defaults; see _ARG_DEFAULTS.
+        argument_default=argparse.SUPPRESS,
     )
 
-    def parse_scan_limit(value: str) -> int:
-        try:
-            v = int(value)
-        except ValueError as exc:
-            raise argparse.ArgumentTypeError("--scan-limit must be an integer") from exc
-        if v < 0:
-            raise argparse.ArgumentTypeError("--scan-limit must be >= 0")
-        return v
-
     parser.add_argument(
         "--resolution",
-        type=parse_resolution,
-        default=None,
+        action=_ResolutionAction,
         help="Output resolution as WIDTHxHEIGHT (e.g. 1920x1080). Default: 1280x720 or auto."
     )
 
@@ -69,6 +144,12 @@ def build_parser() -> argparse.ArgumentParser:
         help="Print the effective config after applying preset/config/CLI overrides.",
     )
 
+    parser.add_argument(
+        "--config-format",
+        choices=["yaml", "json"],
+        help="Format used to print the effective config (default: yaml).",
+    )
+
     parser.add_argument(
         "--name",
         "--week",
@@ -80,86 +161,74 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--input",
         type=Path,
-        default=Path("./input"),
         help="Path to input directory (default: ./input)",
     )
 
     parser.add_argument(
         "--bgm",
         type=Path,
-        default=Path("./bgm"),
         help="Path to background music directory (default: ./bgm)",
     )
 
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path("./output"),
         help="Path to output directory (default: ./output)",
     )
 
     parser.add_argument(
         "--duration",
         type=float,
-        default=float(DEFAULTS["duration"]),
-        help=f"Duration in seconds for the preview video (default: {DEFAULTS['duration']})",
+        help=_HELP_TEXT["duration"],
     )
 
     parser.add_argument(
         "--photo-seconds",
         type=float,
-        default=float(DEFAULTS["photo_seconds"]),
-        help=f"Base duration per photo clip (default: {DEFAULTS['photo_seconds']})",
+        help=_HELP_TEXT["photo_seconds"],
     )
 
     parser.add_argument(
         "--video-max-seconds",
         type=float,
-        default=float(DEFAULTS["video_max_seconds"]),
-        help=f"Max duration per video clip (default: {DEFAULTS['video_max_seconds']})",
+        help=_HELP_TEXT["video_max_seconds"],
     )
 
     parser.add_argument(
         "--photo-max-seconds",
         type=float,
-        default=float(DEFAULTS["photo_max_seconds"]),
-        help=f"Max duration per photo clip when distributing time (default: {DEFAULTS['photo_max_seconds']})",
+        help=_HELP_TEXT["photo_max_seconds"],
     )
 
     parser.add_argument(
         "--timeline-mode",
         type=str,
         choices=["even", "weighted", "preserve-videos"],
-        default=str(DEFAULTS["timeline_mode"]),
         help="Timeline allocation mode (even, weighted, preserve-videos).",
     )
 
     parser.add_argument(
         "--video-weight",
         type=float,
-        default=float(DEFAULTS["video_weight"]),
-        help=f"Weight multiplier for videos in weighted mode (default: {DEFAULTS['video_weight']})",
+        help=_HELP_TEXT["video_weight"],
     )
 
     parser.add_argument(
         "--transition",
         type=float,
-        default=float(DEFAULTS["transition"]),
-        help=f"Per-clip transition length in seconds (fade-in/out, default: {DEFAULTS['transition']}). Set 0 to disable.",
+        help=_HELP_TEXT["transition"],
     )
 
     parser.add_argument(
         "--fade-max-ratio",
         type=float,
-        default=float(DEFAULTS["fade_max_ratio"]),
-        help=f"Max fade duration as a ratio of clip length (default: {DEFAULTS['fade_max_ratio']} = no cap).",
+        help=_HELP_TEXT["fade_max_ratio"],
     )
 
     parser.add_argument(
         "--fps",
         type=int,
-        default=int(DEFAULTS["fps"]),
-        help=f"Frames per second for output video (default: {DEFAULTS['fps']})",
+        help=_HELP_TEXT["fps"],
     )
 
     parser.add_argument(
@@ -184,8 +253,7 @@ def build_parser() -> argparse.ArgumentParser:
 
     parser.add_argument(
         "--scan-limit",
-        type=parse_scan_limit,
-        default=20,
+        action=_ScanLimitAction,
         help="Maximum number of media items to display in verbose scan output (default: 20).",
     )
 
@@ -198,38 +266,59 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--bg-blur",
         type=float,
-        default=float(DEFAULTS["bg_blur"]),
-        help=f"Blur radius for background of portrait photos (default: {DEFAULTS['bg_blur']}, set 0 to disable)",
+        help=_HELP_TEXT["bg_blur"],
     )
 
     parser.add_argument(
         "--bgm-volume",
         type=float,
-        default=float(DEFAULTS["bgm_volume"]),
-        help=f"BGM volume level as percentage of original video audio (default: {DEFAULTS['bgm_volume']}, range: 0-200)",
+        help=_HELP_TEXT["bgm_volume"],
     )
 
     return parser
 
 
+def _format_timeline_summary(summary: dict) -> str:
+    return (
+        "Timeline summary: "
+        f"target={summary['target_seconds']}s "
+        f"total={summary['total_planned']:.2f}s "
+        f"photos={int(summary['photo_count'])} "
+        f"videos={int(summary['video_count'])} "
+        f"per_photo={summary['per_photo']:.2f}s "
+        f"per_video={summary['per_video']:.2f}s"
+    )
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     """CLI entry point.
 
-    Parses arguments and returns an exit code. No application logic is
-    implemented yet; this function only demonstrates argument parsing and
-    a friendly startup message.
+    Parses arguments, resolves the effective config (preset < config file
+    < CLI flags), then either reports (dry run / print-config) or renders
+    through `run_e2e`. Returns an exit code.
     """
     parser = build_parser()
-    args = parser.parse_args(argv)
-
-    # Apply preset defaults, then let explicit CLI flags override.
-    from .config import build_config_defaults, build_effective_config, format_effective_config, load_yaml_config
-    from .presets import detect_provided_options
     argv_tokens = argv if argv is not None else sys.argv[1:]
     # Backward-compat: when no arguments at all, require --name to guide usage
     if not argv_tokens:
         parser.error("argument --name is required")
-    provided = detect_provided_options(argv_tokens)
+    args = parser.parse_args(argv_tokens)
+    # With argument_default=SUPPRESS only explicitly given options are set
+    provided = frozenset(vars(args))
+    for key, value in _ARG_DEFAULTS.items():
+        if key not in provided:
+            setattr(args, key, value)
+
+    # Apply preset defaults, then let explicit CLI flags override.
+    from .config import (
+        CONFIG_KEYS,
+        build_config_defaults,
+        build_effective_config,
+        dump_config_json,
+        dump_config_yaml,
+        format_effective_config,
+        load_yaml_config,
+    )
 
     config_values = {}
     if args.config:
@@ -245,49 +334,15 @@ def main(argv: Optional[List[str]] = None) -> int:
         preset_name = str(config_values.get("preset"))
 
     base = build_config_defaults()
-    cli_values = {
-        "preset": args.preset,
-        "name": args.name,
-        "input": args.input,
-        "output": args.output,
-        "bgm": args.bgm,
-        "resolution": args.resolution,
-        "fps": int(args.fps),
-        "duration": float(args.duration),
-        "photo_seconds": float(args.photo_seconds),
-        "video_max_seconds": float(args.video_max_seconds),
-        "photo_max_seconds": float(args.photo_max_seconds),
-        "timeline_mode": str(args.timeline_mode),
-        "video_weight": float(args.video_weight),
-        "transition": float(args.transition),
-        "fade_max_ratio": float(args.fade_max_ratio),
-        "bg_blur": float(args.bg_blur),
-        "bgm_volume": float(args.bgm_volume),
-        "scan_all": bool(args.scan_all),
-        "preserve_videos": bool(args.preserve_videos),
-    }
+    # Every config key doubles as the dest of the matching CLI option
+    cli_values = {key: getattr(args, key) for key in CONFIG_KEYS}
     effective = build_effective_config(base, preset_name, config_values, cli_values, provided)
 
     # Reflect effective values back to args
+    for key in CONFIG_KEYS:
+        if key in effective:
+            setattr(args, key, effective[key])
     args.preset = preset_name
-    args.name = effective.get("name", args.name)
-    args.input = effective.get("input", args.input)
-    args.output = effective.get("output", args.output)
-    args.bgm = effective.get("bgm", args.bgm)
-    args.resolution = effective.get("resolution", args.resolution)
-    args.fps = int(effective.get("fps", args.fps))
-    args.duration = float(effective.get("duration", args.duration))
-    args.photo_seconds = float(effective.get("photo_seconds", args.photo_seconds))
-    args.video_max_seconds = float(effective.get("video_max_seconds", args.video_max_seconds))
-    args.photo_max_seconds = float(effective.get("photo_max_seconds", args.photo_max_seconds))
-    args.timeline_mode = str(effective.get("timeline_mode", args.timeline_mode))
-    args.video_weight = float(effective.get("video_weight", args.video_weight))
-    args.transition = float(effective.get("transition", args.transition))
-    args.fade_max_ratio = float(effective.get("fade_max_ratio", args.fade_max_ratio))
-    args.bg_blur = float(effective.get("bg_blur", args.bg_blur))
-    args.bgm_volume = float(effective.get("bgm_volume", args.bgm_volume))
-    args.scan_all = bool(effective.get("scan_all", args.scan_all))
-    args.preserve_videos = bool(effective.get("preserve_videos", args.preserve_videos))
 
     if args.preserve_videos:
         if args.timeline_mode != "preserve-videos":
@@ -302,160 +357,123 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     # Week is optional; scanning behavior controlled by --scan-all
 
-    # Prepare app entry
-    from .app import run_e2e
-    from .scan import build_no_media_message, build_scan_summary_lines, scan_media_with_report
-
+    # Imports below live in the branches that need them so that light paths
+    # (dry run, print-config) do not load the rendering stack.
     scan_items = None
     scan_report = None
     if args.dry_run or args.verbose_scan or args.print_config:
+        from .scan import scan_media_with_report
+
         scan_items, scan_report = scan_media_with_report(
             args.input,
-            scan_all=bool(args.scan_all),
-            sample_limit=int(args.scan_limit),
+            scan_all=args.scan_all,
+            sample_limit=args.scan_limit,
         )
 
+    dump_config = dump_config_json if args.config_format == "json" else dump_config_yaml
+
+    # Plan the timeline once for both the print-config and dry-run reports
+    plans = None
+    timeline_line = None
+    if scan_items is not None and (args.print_config or args.dry_run):
+        from .timeline import build_timeline, summarize_timeline
+
+        plans = build_timeline(
+            scan_items,
+            target_seconds=args.duration,
+            photo_seconds=args.photo_seconds,
+            video_max_seconds=args.video_max_seconds,
+            photo_max_seconds=args.photo_max_seconds,
+            timeline_mode=args.timeline_mode,
+            video_weight=args.video_weight,
+        )
+        timeline_line = _format_timeline_summary(summarize_timeline(plans, args.duration))
+
     if args.print_config:
         printable = format_effective_config(effective)
-        print(yaml.safe_dump(printable, sort_keys=False).strip())
-        if scan_items is not None:
-            from .timeline import build_timeline, summarize_timeline
-
-            plans = build_timeline(
-                scan_items,
-                target_seconds=float(args.duration),
-                photo_seconds=float(args.photo_seconds),
-                video_max_seconds=float(args.video_max_seconds),
-                photo_max_seconds=float(args.photo_max_seconds),
-                timeline_mode=str(args.timeline_mode),
-                video_weight=float(args.video_weight),
-            )
-            summary = summarize_timeline(plans, float(args.duration))
-            print(
-                "Timeline summary: "
-                f"target={summary['target_seconds']}s "
-                f"total={summary['total_planned']:.2f}s "
-                f"photos={int(summary['photo_count'])} "
-                f"videos={int(summary['video_count'])} "
-                f"per_photo={summary['per_photo']:.2f}s "
-                f"per_video={summary['per_video']:.2f}s"
-            )
+        out = [dump_config(printable).strip()]
+        if timeline_line is not None:
+            out.append(timeline_line)
+        out.append("")
+        sys.stdout.write("\n".join(out))
 
     if args.dry_run:
         # Dry run: report what would happen
-        from .timeline import build_timeline, summarize_timeline
-        items = scan_items or []
+        from .scan import build_no_media_message, build_scan_summary_lines, choose_bgm
+
+        eff_res = args.resolution
+        if eff_res is not None:
+            res_txt = f"{eff_res[0]}x{eff_res[1]}"
+        elif args.preserve_videos:
+            res_txt = "auto (max video size, fallback 1280x720)"
+        else:
+            res_txt = "1280x720"
+        preset_txt = args.preset or "none"
+
+        # Collect the whole report and emit it with a single write
+        out = []
         report = scan_report
         if report is not None:
             if report.media_count == 0:
-                for line in build_no_media_message(report):
-                    print(line)
+                out.extend(build_no_media_message(report))
             else:
-                for line in build_scan_summary_lines(report):
-                    print(line)
+                out.extend(build_scan_summary_lines(report))
                 if args.scan_limit != 0:
-                    print(f"Sample media (first {min(len(report.sample_items), args.scan_limit)}):")
-                    for it in report.sample_items:
-                        print(f"  - {it.kind} {it.timestamp.isoformat()} {it.path}")
+                    out.append(f"Sample media (first {min(len(report.sample_items), args.scan_limit)}):")
+                    out.extend(f"  - {it.kind} {it.timestamp.isoformat()} {it.path}" for it in report.sample_items)
 
-        plans = build_timeline(
-            items,
-            target_seconds=float(args.duration),
-            photo_seconds=float(args.photo_seconds),
-            video_max_seconds=float(args.video_max_seconds),
-            photo_max_seconds=float(args.photo_max_seconds),
-            timeline_mode=str(args.timeline_mode),
-            video_weight=float(args.video_weight),
-        )
         # Choose bgm summary
-        bgm_choice = None
-        if args.bgm and args.bgm.exists():
-            if args.bgm.is_file():
-                bgm_choice = args.bgm
-            else:
-                files = sorted([p for p in args.bgm.iterdir() if p.is_file()])
-                bgm_choice = files[0] if files else None
-
-        print(f"Timeline entries: {len(plans)}")
-        summary = summarize_timeline(plans, float(args.duration))
-        print(
-            "Timeline summary: "
-            f"target={summary['target_seconds']}s "
-            f"total={summary['total_planned']:.2f}s "
-            f"photos={int(summary['photo_count'])} "
-            f"videos={int(summary['video_count'])} "
-            f"per_photo={summary['per_photo']:.2f}s "
-            f"per_video={summary['per_video']:.2f}s"
-        )
-        print(f"Chosen BGM: {bgm_choice}")
+        bgm_choice = choose_bgm(args.bgm)
+
+        out.append(f"Timeline entries: {len(plans)}")
+        if not args.print_config:
+            out.append(timeline_line)
+        out.append(f"Chosen BGM: {bgm_choice}")
         # Preset summary + effective values
-        print(f"Preset: {getattr(args, 'preset', None) or 'none'}")
+        out.append(f"Preset: {preset_txt}")
         if not args.print_config:
             printable = format_effective_config(effective)
-            print(yaml.safe_dump(printable, sort_keys=False).strip())
-        eff_res = args.resolution
-        if eff_res is not None:
-            res_txt = f"{eff_res[0]}x{eff_res[1]}"
-        elif args.preserve_videos:
-            res_txt = "auto (max video size, fallback 1280x720)"
-        else:
-            res_txt = "1280x720"
-        print(f"Effective resolution: {res_txt}")
-        print(f"Effective duration: {float(args.duration)}s")
-        print(f"Effective transition: {float(args.transition)}s")
-        print(f"Effective bg_blur: {float(args.bg_blur)}")
-        print(f"Effective bgm_volume: {float(args.bgm_volume)}%")
+            out.append(dump_config(printable).strip())
+        out.append(f"Effective resolution: {res_txt}")
+        out.append(f"Effective duration: {args.duration}s")
+        out.append(f"Effective transition: {args.transition}s")
+        out.append(f"Effective bg_blur: {args.bg_blur}")
+        out.append(f"Effective bgm_volume: {args.bgm_volume}%")
+        out.append("")
+        sys.stdout.write("\n".join(out))
         return 0
 
     if args.verbose_scan and scan_report is not None:
         if scan_report.media_count > 0 and args.scan_limit != 0:
-            print(f"Sample media (first {min(len(scan_report.sample_items), args.scan_limit)}):")
-            for it in scan_report.sample_items:
-                print(f"  - {it.kind} {it.timestamp.isoformat()} {it.path}")
+            out = [f"Sample media (first {min(len(scan_report.sample_items), args.scan_limit)}):"]
+            out.extend(f"  - {it.kind} {it.timestamp.isoformat()} {it.path}" for it in scan_report.sample_items)
+            out.append("")
+            sys.stdout.write("\n".join(out))
 
     # Non-dry run: run end-to-end
-    if scan_items is not None and scan_report is not None:
-        return run_e2e(
-            args.name,
-            args.input,
-            args.bgm,
-            args.output,
-            duration=float(args.duration),
-            fps=int(args.fps),
-            transition=float(args.transition),
-            fade_max_ratio=float(args.fade_max_ratio),
-            preserve_videos=bool(args.preserve_videos),
-            bg_blur=float(args.bg_blur),
-            bgm_volume=float(args.bgm_volume),
-            resolution=args.resolution,
-            scan_all_flag=bool(args.scan_all),
-            photo_seconds=float(args.photo_seconds),
-            video_max_seconds=float(args.video_max_seconds),
-            photo_max_seconds=float(args.photo_max_seconds),
-            timeline_mode=str(args.timeline_mode),
-            video_weight=float(args.video_weight),
-            pre_scanned=scan_items,
-            scan_report=scan_report,
-        )
+    from .app import run_e2e
 
-    rc = run_e2e(
+    # run_e2e scans by itself when no pre-scanned items are handed over
+    return run_e2e(
         args.name,
         args.input,
         args.bgm,
         args.output,
-        duration=float(args.duration),
-        fps=int(args.fps),
-        transition=float(args.transition),
-        fade_max_ratio=float(args.fade_max_ratio),
-        preserve_videos=bool(args.preserve_videos),
-        bg_blur=float(args.bg_blur),
-        bgm_volume=float(args.bgm_volume),
+        duration=args.duration,
+        fps=args.fps,
+        transition=args.transition,
+        fade_max_ratio=args.fade_max_ratio,
+        preserve_videos=args.preserve_videos,
+        bg_blur=args.bg_blur,
+        bgm_volume=args.bgm_volume,
         resolution=args.resolution,
-        scan_all_flag=bool(args.scan_all),
-        photo_seconds=float(args.photo_seconds),
-        video_max_seconds=float(args.video_max_seconds),
-        photo_max_seconds=float(args.photo_max_seconds),
-        timeline_mode=str(args.timeline_mode),
-        video_weight=float(args.video_weight),
+        scan_all_flag=args.scan_all,
+        photo_seconds=args.photo_seconds,
+        video_max_seconds=args.video_max_seconds,
+        photo_max_seconds=args.photo_max_seconds,
+        timeline_mode=args.timeline_mode,
+        video_weight=args.video_weight,
+        pre_scanned=scan_items,
+        scan_report=scan_report,
+        encoder_preset=ENCODER_PRESETS.get(args.preset),
     )
-    return rc
@@ -1,14 +1,13 @@
 from __future__ import annotations
 
-import re
+import functools
+import json
+import os
 from pathlib import Path
-from typing import Any, Dict, Iterable
-
-import yaml
+from typing import Any, Callable, Dict, Iterable, NamedTuple
 
 from .presets import DEFAULTS, merge_preset
 
-_RESOLUTION_RE = re.compile(r"^(\d{2,5})x(\d{2,5})$")
 
 CONFIG_KEYS = {
     "preset",
@@ -34,6 +33,13 @@ CONFIG_KEYS = {
 
 PATH_KEYS = {"input", "output", "bgm"}
 
+_EMPTY_FROZENSET: frozenset[str] = frozenset()
+
+# Exact spellings seen in practice (snake_case or kebab-case) -> canonical key;
+# anything else goes through the full strip/lower/replace normalization.
+_KEY_SPELLINGS: Dict[str, str] = {k: k for k in CONFIG_KEYS}
+_KEY_SPELLINGS.update({k.replace("_", "-"): k for k in CONFIG_KEYS})
+
 CONFIG_PRINT_ORDER = [
     "preset",
     "name",
@@ -81,92 +87,66 @@ def build_config_defaults() -> Dict[str, Any]:
     }
 
 
-def load_yaml_config(path: Path) -> Dict[str, Any]:
+def load_yaml_config(path: Path, resolve_paths: bool = False) -> Dict[str, Any]:
+    """Load and normalize a YAML config file.
+
+    Relative paths are joined to the config file's directory; pass
+    `resolve_paths=True` to also canonicalize them (symlinks, "..").
+
+    Parsed results are memoized per process, keyed on the file's absolute
+    path, mtime and size, so an edited file is always re-read. Set
+    VIDEO_ENGINE_NO_YAML_CACHE=1 to bypass the cache.
+    """
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
-    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    if os.environ.get("VIDEO_ENGINE_NO_YAML_CACHE") == "1":
+        return _read_yaml_config(path, resolve_paths)
+    st = path.stat()
+    # Callers may mutate the result; hand out a copy of the cached mapping
+    return dict(
+        _read_yaml_config_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size, resolve_paths)
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _read_yaml_config_cached(abs_path: str, mtime_ns: int, size: int, resolve_paths: bool) -> Dict[str, Any]:
+    return _read_yaml_config(Path(abs_path), resolve_paths)
+
+
+def _read_yaml_config(path: Path, resolve_paths: bool) -> Dict[str, Any]:
+    # PyYAML is imported on first use so runs without a config file skip it;
+    # prefer the libyaml-backed C loader when PyYAML was built with it.
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    data = yaml.load(path.read_text(encoding="utf-8"), Loader=loader)
     if data is None:
         return {}
     if not isinstance(data, dict):
         raise ValueError("Config root must be a mapping")
-    return normalize_config(data, path)
+    return normalize_config(data, path, resolve_paths=resolve_paths)
 
 
-def normalize_config(raw: Dict[str, Any], config_path: Path) -> Dict[str, Any]:
+def normalize_config(
+    raw: Dict[str, Any],
+    config_path: Path,
+    resolve_paths: bool = False,
+) -> Dict[str, Any]:
+    if not raw:
+        return {}
     normalized: Dict[str, Any] = {}
-    base_dir = config_path.parent
+    ctx = _NormalizeContext(config_path.parent, resolve_paths)
 
     for key, value in raw.items():
         if not isinstance(key, str):
             raise ValueError("Config keys must be strings")
-        norm_key = key.strip().lower().replace("-", "_")
-        if norm_key not in CONFIG_KEYS:
+        norm_key = _KEY_SPELLINGS.get(key)
+        if norm_key is None:
+            norm_key = key.strip().lower().replace("-", "_")
+        handler = _KEY_HANDLERS.get(norm_key)
+        if handler is None:
             raise ValueError(f"Unknown config key: {key}")
-
-        if norm_key in PATH_KEYS:
-            if value is None:
-                normalized[norm_key] = None
-                continue
-            if not isinstance(value, str):
-                raise ValueError(f"Config key {key} must be a string path")
-            resolved = _resolve_path(Path(value), base_dir)
-            normalized[norm_key] = resolved
-            continue
-
-        if norm_key == "resolution":
-            normalized[norm_key] = _parse_resolution_value(value)
-            continue
-
-        if norm_key in {"scan_all", "preserve_videos"}:
-            if not isinstance(value, bool):
-                raise ValueError(f"Config key {key} must be a boolean")
-            normalized[norm_key] = value
-            continue
-
-        if norm_key == "timeline_mode":
-            if value is None:
-                normalized[norm_key] = None
-                continue
-            if not isinstance(value, str):
-                raise ValueError(f"Config key {key} must be a string")
-            mode = value.strip().lower()
-            if mode not in {"even", "weighted", "preserve-videos"}:
-                raise ValueError("timeline_mode must be one of: even, weighted, preserve-videos")
-            normalized[norm_key] = mode
-            continue
-
-        if norm_key == "video_weight":
-            val = _parse_float_value(key, value)
-            if val <= 0:
-                raise ValueError("video_weight must be > 0")
-            normalized[norm_key] = val
-            continue
-
-        if norm_key == "fps":
-            normalized[norm_key] = _parse_int_value(key, value)
-            continue
-
-        if norm_key in {
-            "duration",
-            "photo_seconds",
-            "video_max_seconds",
-            "photo_max_seconds",
-            "transition",
-            "fade_max_ratio",
-            "bg_blur",
-            "bgm_volume",
-        }:
-            normalized[norm_key] = _parse_float_value(key, value)
-            continue
-
-        if norm_key in {"preset", "name"}:
-            if value is None:
-                normalized[norm_key] = None
-                continue
-            if not isinstance(value, str):
-                raise ValueError(f"Config key {key} must be a string")
-            normalized[norm_key] = value
-            continue
+        normalized[norm_key] = handler(key, value, ctx)
 
     return normalized
 
@@ -178,14 +158,51 @@ def build_effective_config(
     cli_values: Dict[str, Any],
     cli_provided: Iterable[str],
 ) -> Dict[str, Any]:
-    effective = merge_preset(preset_name, base, provided=set())
+    """Layer preset, config file and CLI values over `base`.
+
+    The merge is deterministic, so results are memoized on a hashable
+    snapshot of the inputs; inputs holding unhashable values are merged
+    directly. The returned dict is always a fresh copy.
+    """
+    snapshot = (
+        tuple(base.items()),
+        preset_name,
+        tuple(config_values.items()),
+        tuple(cli_values.items()),
+        # frozenset() of a frozenset returns it as-is, so no copy for cli.main
+        frozenset(cli_provided),
+    )
+    try:
+        return dict(_merge_effective_cached(snapshot))
+    except TypeError:  # unhashable value somewhere in the inputs
+        return _merge_effective(*snapshot)
+
+
+@functools.lru_cache(maxsize=64)
+def _merge_effective_cached(snapshot: tuple) -> Dict[str, Any]:
+    return _merge_effective(*snapshot)
 
-    for key, value in config_values.items():
+
+def _merge_effective(
+    base_items: tuple,
+    preset_name: str | None,
+    config_items: tuple,
+    cli_items: tuple,
+    cli_provided: frozenset,
+) -> Dict[str, Any]:
+    base = dict(base_items)
+    if preset_name:
+        effective = merge_preset(preset_name, base, provided=_EMPTY_FROZENSET)
+    else:
+        effective = base
+
+    for key, value in config_items:
         if key == "preset":
             continue
         if value is not None:
             effective[key] = value
 
+    cli_values = dict(cli_items)
     for key in cli_provided:
         if key in cli_values:
             effective[key] = cli_values[key]
@@ -194,38 +211,93 @@ def build_effective_config(
 
 
 def format_effective_config(effective: Dict[str, Any]) -> Dict[str, Any]:
-    output: Dict[str, Any] = {}
-    for key in CONFIG_PRINT_ORDER:
-        if key not in effective:
-            continue
-        value = effective[key]
-        if isinstance(value, Path):
-            output[key] = str(value)
-        elif isinstance(value, tuple) and len(value) == 2:
-            output[key] = f"{value[0]}x{value[1]}"
-        else:
-            output[key] = value
-    return output
+    return {
+        key: _PRINT_FORMATTERS.get(key, _identity)(effective[key])
+        for key in CONFIG_PRINT_ORDER
+        if key in effective
+    }
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _format_path(value: Path | None) -> str | None:
+    return None if value is None else str(value)
+
 
+def _format_resolution(value: tuple[int, int] | None) -> str | None:
+    return None if value is None else f"{value[0]}x{value[1]}"
 
-def _resolve_path(path: Path, base_dir: Path) -> Path:
+
+# Printable form for keys whose effective values are not plain scalars
+_PRINT_FORMATTERS: Dict[str, Callable[[Any], Any]] = {
+    "input": _format_path,
+    "output": _format_path,
+    "bgm": _format_path,
+    "resolution": _format_resolution,
+}
+
+
+def dump_config_yaml(printable: Dict[str, Any]) -> str:
+    """Serialize a `format_effective_config` result as YAML (key order kept)."""
+    import yaml
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml.dump(printable, Dumper=dumper, sort_keys=False)
+
+
+def dump_config_json(printable: Dict[str, Any]) -> str:
+    """Serialize a `format_effective_config` result as a single JSON object."""
+    return json.dumps(printable, ensure_ascii=False, default=str)
+
+
+def _resolve_path(path: Path, base_dir: Path, resolve: bool = False) -> Path:
     if path.is_absolute():
         return path
-    return (base_dir / path).resolve(strict=False)
+    joined = base_dir / path
+    # realpath() costs a syscall per component; only pay it when asked to
+    return joined.resolve(strict=False) if resolve else joined
+
+
+# Supported output size: (min width, min height, max width, max height)
+_RESOLUTION_BOUNDS = (320, 240, 8192, 4320)
+
+
+def parse_resolution_str(text: str) -> tuple[int, int]:
+    """Parse "WIDTHxHEIGHT" (2-5 digits each) within the supported range.
+
+    Raises ValueError with a message suitable for both CLI and config errors.
+    """
+    w_str, sep, h_str = text.partition("x")
+    # isdecimal() accepts exactly what a regex \d would
+    if (
+        not sep
+        or not w_str.isdecimal()
+        or not h_str.isdecimal()
+        or not 2 <= len(w_str) <= 5
+        or not 2 <= len(h_str) <= 5
+    ):
+        raise ValueError("resolution must be in WIDTHxHEIGHT format, e.g. 1920x1080")
+    return _check_resolution_bounds(int(w_str), int(h_str))
+
+
+def _check_resolution_bounds(w: int, h: int) -> tuple[int, int]:
+    min_w, min_h, max_w, max_h = _RESOLUTION_BOUNDS
+    if not (min_w <= w <= max_w and min_h <= h <= max_h):
+        raise ValueError("resolution values out of supported range (min 320x240, max 8192x4320)")
+    return w, h
 
 
 def _parse_resolution_value(value: Any) -> tuple[int, int] | None:
     if value is None:
         return None
     if isinstance(value, str):
-        m = _RESOLUTION_RE.match(value.strip())
-        if not m:
-            raise ValueError("resolution must be in WIDTHxHEIGHT format, e.g. 1920x1080")
-        return int(m.group(1)), int(m.group(2))
+        return parse_resolution_str(value.strip())
     if isinstance(value, (list, tuple)) and len(value) == 2:
-        return int(value[0]), int(value[1])
+        return _check_resolution_bounds(int(value[0]), int(value[1]))
     if isinstance(value, dict) and "width" in value and "height" in value:
-        return int(value["width"]), int(value["height"])
+        return _check_resolution_bounds(int(value["width"]), int(value["height"]))
     raise ValueError("resolution must be WIDTHxHEIGHT string or [width, height]")
 
 
@@ -241,3 +313,85 @@ def _parse_int_value(name: str, value: Any) -> int:
         return int(value)
     except Exception as exc:
         raise ValueError(f"Config key {name} must be an integer") from exc
+
+
+class _NormalizeContext(NamedTuple):
+    base_dir: Path
+    resolve_paths: bool
+
+
+# Per-key normalizers: (original key spelling, raw value, context) -> value
+
+def _path_handler(key: str, value: Any, ctx: _NormalizeContext) -> Path | None:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Config key {key} must be a string path")
+    return _resolve_path(Path(value), ctx.base_dir, ctx.resolve_paths)
+
+
+def _resolution_handler(key: str, value: Any, ctx: _NormalizeContext) -> tuple[int, int] | None:
+    return _parse_resolution_value(value)
+
+
+def _bool_handler(key: str, value: Any, ctx: _NormalizeContext) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError(f"Config key {key} must be a boolean")
+    return value
+
+
+def _timeline_mode_handler(key: str, value: Any, ctx: _NormalizeContext) -> str | None:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Config key {key} must be a string")
+    mode = value.strip().lower()
+    if mode not in {"even", "weighted", "preserve-videos"}:
+        raise ValueError("timeline_mode must be one of: even, weighted, preserve-videos")
+    return mode
+
+
+def _video_weight_handler(key: str, value: Any, ctx: _NormalizeContext) -> float:
+    val = _parse_float_value(key, value)
+    if val <= 0:
+        raise ValueError("video_weight must be > 0")
+    return val
+
+
+def _int_handler(key: str, value: Any, ctx: _NormalizeContext) -> int:
+    return _parse_int_value(key, value)
+
+
+def _float_handler(key: str, value: Any, ctx: _NormalizeContext) -> float:
+    return _parse_float_value(key, value)
+
+
+def _optional_str_handler(key: str, value: Any, ctx: _NormalizeContext) -> str | None:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Config key {key} must be a string")
+    return value
+
+
+_KEY_HANDLERS: Dict[str, Callable[[str, Any, _NormalizeContext], Any]] = {
+    "input": _path_handler,
+    "output": _path_handler,
+    "bgm": _path_handler,
+    "resolution": _resolution_handler,
+    "scan_all": _bool_handler,
+    "preserve_videos": _bool_handler,
+    "timeline_mode": _timeline_mode_handler,
+    "video_weight": _video_weight_handler,
+    "fps": _int_handler,
+    "duration": _float_handler,
+    "photo_seconds": _float_handler,
+    "video_max_seconds": _float_handler,
+    "photo_max_seconds": _float_handler,
+    "transition": _float_handler,
+    "fade_max_ratio": _float_handler,
+    "bg_blur": _float_handler,
+    "bgm_volume": _float_handler,
+    "preset": _optional_str_handler,
+    "name": _optional_str_handler,
+}
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Dict, Optional, Tuple, Set
+from functools import lru_cache
+from typing import AbstractSet, Dict, Optional, Tuple
 
 # Preset definitions: values act as defaults which can be overridden by CLI flags.
 # Duration choice:
@@ -49,17 +50,31 @@ PRESETS: Dict[str, Dict[str, object]] = {
     },
 }
 
-OPTION_KEYS = {"resolution", "fps", "duration", "transition", "bg_blur", "bgm_volume"}
+# libx264 speed preset per render preset: previews trade compression for encode speed.
+ENCODER_PRESETS: Dict[str, str] = {
+    "youtube": "fast",
+    "mobile": "fast",
+    "preview": "ultrafast",
+}
+
+OPTION_KEYS = frozenset({"resolution", "fps", "duration", "transition", "bg_blur", "bgm_volume"})
 
 
 def build_base_config() -> Dict[str, object]:
-    return dict(DEFAULTS)
+    return DEFAULTS.copy()
+
+
+@lru_cache(maxsize=32)
+def _preset_overlay(preset_name: str, provided: frozenset) -> Tuple[Tuple[str, object], ...]:
+    """(key, value) pairs a preset contributes when `provided` keys are kept."""
+    preset = PRESETS[preset_name]
+    return tuple((k, preset[k]) for k in OPTION_KEYS if k in preset and k not in provided)
 
 
 def merge_preset(
     preset_name: Optional[str],
     base: Dict[str, object],
-    provided: Set[str],
+    provided: AbstractSet[str],
 ) -> Dict[str, object]:
     """Merge preset values into a base config, respecting explicitly provided options.
 
@@ -74,51 +89,6 @@ def merge_preset(
     if not preset:
         return base
 
-    effective = dict(base)
-    for k in OPTION_KEYS:
-        if k in preset and k not in provided:
-            effective[k] = preset[k]
+    effective = base.copy()
+    effective.update(_preset_overlay(preset_name, frozenset(provided)))
     return effective
-
-
-def detect_provided_options(argv_tokens: Optional[list[str]]) -> Set[str]:
-    """Detect which CLI options were explicitly provided by scanning argv tokens.
-
-    Returns a set of option keys among OPTION_KEYS.
-    Handles forms like:
-    - --duration 60
-    - --duration=60
-    - --resolution 1920x1080
-    - --resolution=1920x1080
-    """
-    provided: Set[str] = set()
-    if not argv_tokens:
-        return provided
-
-    def mark_if_present(name: str, key: str):
-        for t in argv_tokens:
-            if t == name or t.startswith(name + "="):
-                provided.add(key)
-                break
-
-    mark_if_present("--resolution", "resolution")
-    mark_if_present("--duration", "duration")
-    mark_if_present("--transition", "transition")
-    mark_if_present("--bg-blur", "bg_blur")
-    mark_if_present("--bgm-volume", "bgm_volume")
-    mark_if_present("--fade-max-ratio", "fade_max_ratio")
-    mark_if_present("--fps", "fps")
-    mark_if_present("--photo-seconds", "photo_seconds")
-    mark_if_present("--video-max-seconds", "video_max_seconds")
-    mark_if_present("--photo-max-seconds", "photo_max_seconds")
-    mark_if_present("--timeline-mode", "timeline_mode")
-    mark_if_present("--video-weight", "video_weight")
-    mark_if_present("--name", "name")
-    mark_if_present("--week", "name")
-    mark_if_present("--input", "input")
-    mark_if_present("--output", "output")
-    mark_if_present("--bgm", "bgm")
-    mark_if_present("--preset", "preset")
-    mark_if_present("--scan-all", "scan_all")
-    mark_if_present("--preserve-videos", "preserve_videos")
-    return provided
@@ -8,9 +8,11 @@ error messages when dependencies are missing.
 from __future__ import annotations
 
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Optional
 import os
 import shutil
+import stat
 import subprocess
 import sys
 from functools import lru_cache
@@ -18,7 +20,13 @@ import tempfile
 import time
 import threading
 import queue
-from collections import deque
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from fractions import Fraction
+import hashlib
+import json
+import math
 
 from .presets import DEFAULTS
 
@@ -28,7 +36,8 @@ try:
     import PIL.Image as PILImage
 
     if not hasattr(PILImage, "ANTIALIAS") and hasattr(PILImage, "Resampling"):
-        PILImage.ANTIALIAS = PILImage.Resampling.LANCZOS
+        # Plain int: resize() then skips the enum conversion on every call
+        PILImage.ANTIALIAS = int(PILImage.Resampling.LANCZOS)
 except Exception:
     pass
 
@@ -41,6 +50,8 @@ def render_single_photo(
     bgm_path: Optional[Path] = None,
     fade_in: float = 1.0,
     fade_out: float = 1.0,
+    encoder_preset: Optional[str] = None,
+    hwaccel: Optional[str] = "auto",
 ) -> None:
     """Render a single photo as an MP4 video, optionally with background music.
 
@@ -51,65 +62,65 @@ def render_single_photo(
     - fps: frames per second to write
     - bgm_path: optional Path to an audio file to use as background music
     - fade_in/fade_out: seconds for audio fade-in/out (will be clamped to <= duration/2)
+    - encoder_preset: libx264 speed preset (e.g. "ultrafast"); defaults to "fast".
+      VIDEO_ENGINE_FFMPEG_PRESET overrides it
+    - hwaccel: "auto" uses a working hardware encoder when one is found,
+      "none" forces libx264, any other value is taken as the encoder name.
+      Falls back to libx264 if the chosen encoder fails
 
     Raises
     - FileNotFoundError: if ``photo_path`` or ``bgm_path`` (when provided) does not exist
-    - RuntimeError: if moviepy is not installed or rendering fails
+    - RuntimeError: if rendering fails, or ffmpeg is not found and moviepy is not installed
+
+    With ffmpeg available the still is looped by ffmpeg directly (EXIF
+    orientation applied); MoviePy is only used as a fallback.
     """
-    if not photo_path.exists() or not photo_path.is_file():
+    # One stat answers both "exists?" and "regular file?"; the pixels are only
+    # read by whichever renderer runs
+    try:
+        is_file = stat.S_ISREG(photo_path.stat().st_mode)
+    except OSError:
+        is_file = False
+    if not is_file:
         raise FileNotFoundError(f"Photo not found or not a file: {photo_path}")
 
     if bgm_path is not None and (not bgm_path.exists() or not bgm_path.is_file()):
         raise FileNotFoundError(f"BGM not found or not a file: {bgm_path}")
 
+    # ffmpeg loops the still itself: no per-frame MoviePy round-trip
+    if _ffmpeg_available():
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        codec = _resolve_video_encoder(hwaccel) or "libx264"
+        with tempfile.TemporaryDirectory(prefix="ve_ffmpeg_", dir=_fast_tmp()) as tmpdir:
+            raster_path = _ensure_raster_photo(photo_path, tmpdir, 0)
+            for attempt in dict.fromkeys([codec, "libx264"]):
+                cmd = _build_single_photo_cmd(
+                    raster_path, output_path, float(duration), fps, bgm_path, fade_in, fade_out, attempt, encoder_preset
+                )
+                try:
+                    _run_ffmpeg(cmd, progress_total_sec=float(duration), progress_label="photo")
+                    return
+                except RuntimeError as exc:
+                    error = exc
+        raise RuntimeError(f"Failed to render video: {error}") from error
+
     try:
         # Import lazily to provide clear errors when dependency is missing
-        # Support different MoviePy layouts across versions.
-        try:
-            from moviepy.editor import ImageClip, AudioFileClip
-        except Exception:
-            # Fallback paths for newer/older MoviePy versions
-            from moviepy.video.VideoClip import ImageClip  # type: ignore
-            from moviepy.audio.io.AudioFileClip import AudioFileClip  # type: ignore
-
-        # Audio fx: try to import a convenient container; otherwise import specific functions
-        # Audio fx: try to import a convenient container; otherwise import classes
-        audio_loop = None
-        audio_fadein = None
-        audio_fadeout = None
-        AudioLoopClass = None
-        AudioFadeInClass = None
-        AudioFadeOutClass = None
-        try:
-            import moviepy.audio.fx.all as afx
-            audio_loop = getattr(afx, "audio_loop", None)
-            audio_fadein = getattr(afx, "audio_fadein", None)
-            audio_fadeout = getattr(afx, "audio_fadeout", None)
-        except Exception:
-            # Import fx classes for MoviePy versions that expose them as classes
-            try:
-                from moviepy.audio.fx.AudioLoop import AudioLoop as AudioLoopClass
-            except Exception:
-                AudioLoopClass = None
-            try:
-                from moviepy.audio.fx.AudioFadeIn import AudioFadeIn as AudioFadeInClass
-            except Exception:
-                AudioFadeInClass = None
-            try:
-                from moviepy.audio.fx.AudioFadeOut import AudioFadeOut as AudioFadeOutClass
-            except Exception:
-                AudioFadeOutClass = None
+        mp = _load_moviepy()
     except Exception as exc:  # pragma: no cover - depends on environment
         raise RuntimeError(
             "moviepy is required for rendering with audio; install the 'render' extras (e.g., pip install -e \".[render]\")"
         ) from exc
 
+    ImageClip = mp.ImageClip
+
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
+    loop_tmp = None
     try:
         # Create clip and set duration using APIs compatible across MoviePy versions
-        clip = ImageClip(str(photo_path))
+        clip = ImageClip(_decode_image(photo_path))
         try:
             clip = clip.with_duration(float(duration))
         except Exception:
@@ -118,40 +129,7 @@ def render_single_photo(
 
         audio_clip = None
         if bgm_path is not None:
-            audio = AudioFileClip(str(bgm_path))
-            # Ensure audio is at least `duration` long by looping if necessary
-            if audio.duration < duration:
-                if audio_loop is not None:
-                    audio = audio_loop(audio, duration=duration)
-                elif AudioLoopClass is not None:
-                    audio = audio.with_effects([AudioLoopClass(duration=duration)])
-                else:
-                    # naive concatenation fallback
-                    n = int(duration / audio.duration) + 1
-                    new_audio = audio
-                    for _ in range(n - 1):
-                        new_audio = new_audio + audio
-                    audio = new_audio.subclip(0, float(duration))
-            else:
-                audio = audio.subclip(0, float(duration))
-
-            # Clamp fades
-            max_fade = float(duration) / 2.0
-            fi = min(float(fade_in), max_fade)
-            fo = min(float(fade_out), max_fade)
-
-            if fi > 0:
-                if audio_fadein is not None:
-                    audio = audio_fadein(audio, fi)
-                elif AudioFadeInClass is not None:
-                    audio = audio.with_effects([AudioFadeInClass(fi)])
-            if fo > 0:
-                if audio_fadeout is not None:
-                    audio = audio_fadeout(audio, fo)
-                elif AudioFadeOutClass is not None:
-                    audio = audio.with_effects([AudioFadeOutClass(fo)])
-
-            audio_clip = audio
+            audio_clip, loop_tmp = _prepare_bgm(mp, bgm_path, float(duration), fade_in, fade_out)
             # Set audio on clip, handling different MoviePy versions
             try:
                 clip = clip.set_audio(audio_clip)
@@ -160,54 +138,441 @@ def render_single_photo(
 
         # Write file: include audio codec only if audio is present
         # Prefer hardware encoder when available, with fallback to libx264.
-        codec = _select_video_encoder()
-        write_kwargs = dict(fps=int(fps), codec=codec or "libx264", ffmpeg_params=_compat_ffmpeg_params())
+        codec = _resolve_video_encoder(hwaccel)
+        write_kwargs = dict(fps=int(fps), **_moviepy_encoder_kwargs(codec, encoder_preset, "stillimage"))
         if audio_clip is not None:
-            write_kwargs.update(dict(audio=True, audio_codec="aac"))
+            write_kwargs.update(dict(audio=True, audio_codec="aac", temp_audiofile=_moviepy_temp_audiofile()))
         else:
             write_kwargs.update(dict(audio=False))
 
-        _write_videofile_with_fallback(clip, output_path, write_kwargs)
+        _write_videofile_with_fallback(clip, output_path, write_kwargs, encoder_preset, "stillimage")
     except Exception as exc:  # pragma: no cover - depends on runtime ffmpeg
         raise RuntimeError(f"Failed to render video: {exc}") from exc
+    finally:
+        if loop_tmp is not None:
+            loop_tmp.cleanup()
 
 
-def _close_clip_safe(c):
+def _moviepy_major() -> int:
+    """Installed MoviePy major version; ImportError when MoviePy is missing."""
+    from importlib.metadata import PackageNotFoundError, version
+
     try:
-        c.close()
+        return int(version("moviepy").split(".")[0])
+    except PackageNotFoundError as exc:
+        raise ImportError("moviepy is not installed") from exc
+
+
+@lru_cache(maxsize=1)
+def _load_moviepy() -> SimpleNamespace:
+    """Resolve the MoviePy symbols used here once, for the installed MoviePy.
+
+    MoviePy 1.x exposes audio fx as functions (``audio_loop``...) and 2.x as
+    effect classes (``AudioLoopClass``...); the other flavour is None.
+    `ffmpeg_binary` is the ffmpeg MoviePy is configured with.
+    Raises ImportError when MoviePy is not installed.
+    """
+    import moviepy.config
+
+    ffmpeg_binary = getattr(moviepy.config, "FFMPEG_BINARY", None)
+    if _moviepy_major() >= 2:
+        from moviepy import AudioFileClip, CompositeVideoClip, ImageClip, VideoFileClip, concatenate_videoclips
+        from moviepy.audio.fx import AudioFadeIn, AudioFadeOut, AudioLoop
+
+        return SimpleNamespace(
+            ImageClip=ImageClip,
+            VideoFileClip=VideoFileClip,
+            AudioFileClip=AudioFileClip,
+            CompositeVideoClip=CompositeVideoClip,
+            concatenate_videoclips=concatenate_videoclips,
+            audio_loop=None,
+            audio_fadein=None,
+            audio_fadeout=None,
+            AudioLoopClass=AudioLoop,
+            AudioFadeInClass=AudioFadeIn,
+            AudioFadeOutClass=AudioFadeOut,
+            ffmpeg_binary=ffmpeg_binary,
+        )
+
+    from moviepy.editor import AudioFileClip, CompositeVideoClip, ImageClip, VideoFileClip, concatenate_videoclips
+    import moviepy.audio.fx.all as afx
+
+    return SimpleNamespace(
+        ImageClip=ImageClip,
+        VideoFileClip=VideoFileClip,
+        AudioFileClip=AudioFileClip,
+        CompositeVideoClip=CompositeVideoClip,
+        concatenate_videoclips=concatenate_videoclips,
+        audio_loop=afx.audio_loop,
+        audio_fadein=afx.audio_fadein,
+        audio_fadeout=afx.audio_fadeout,
+        AudioLoopClass=None,
+        AudioFadeInClass=None,
+        AudioFadeOutClass=None,
+        ffmpeg_binary=ffmpeg_binary,
+    )
+
+
+def _decode_image(path: Path):
+    """Decode an image file the way MoviePy's ImageClip does, as a read-only array."""
+    try:
+        from imageio.v2 import imread
+    except ImportError:  # imageio < 2.16
+        from imageio import imread
+    arr = imread(str(path))
+    arr.setflags(write=False)
+    return arr
+
+
+def _load_photo_array(path: Path, cover: tuple[int, int]):
+    """Decode a photo for the MoviePy path, shrunk to just cover `cover` (W, H).
+
+    Camera photos are often several times the canvas size; every later
+    resize/blur/composite step would otherwise work on the full-size array.
+    Uses libvips (optional `pyvips`, shrink-on-load) when installed, else
+    Pillow with JPEG draft decoding. Like MoviePy's ImageClip, EXIF
+    orientation is not applied. Smaller photos and anything either library
+    cannot handle go through `_decode_image` unchanged. Returns a read-only
+    array.
+    """
+    import numpy as np
+
+    W, H = cover
+    try:
+        import pyvips
+    except ImportError:
+        pyvips = None
+    if pyvips is not None:
+        try:
+            head = pyvips.Image.new_from_file(str(path))  # header only; pixels load lazily
+            scale = max(W / head.width, H / head.height)
+            if scale >= 1.0:
+                return _decode_image(path)
+            img = pyvips.Image.thumbnail(
+                str(path), math.ceil(head.width * scale), height=10_000_000, size="down", no_rotate=True
+            )
+            if img.format == "uchar":
+                arr = np.ndarray(buffer=img.write_to_memory(), dtype=np.uint8, shape=[img.height, img.width, img.bands])
+                arr = arr[:, :, 0] if img.bands == 1 else arr
+                arr.setflags(write=False)
+                return arr
+        except pyvips.Error:
+            pass
+    try:
+        from PIL import Image
+
+        with Image.open(path) as img:
+            w, h = img.size
+            scale = max(W / w, H / h)
+            if scale >= 1.0:
+                return _decode_image(path)
+            size = (math.ceil(w * scale), math.ceil(h * scale))
+            # JPEG: let the decoder skip DCT detail we are about to discard
+            img.draft("RGB", size)
+            mode = "RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB"
+            arr = np.asarray(img.convert(mode).resize(size, Image.LANCZOS))
+    except Exception:
+        return _decode_image(path)
+    arr.setflags(write=False)
+    return arr
+
+
+def _video_decode_resolution(path: Path, W: int, H: int) -> Optional[tuple[int, int]]:
+    """VideoFileClip `target_resolution` (height, width) shrinking a source to just cover W x H.
+
+    ffmpeg's scaler then downsizes while decoding instead of MoviePy
+    resizing every full-size frame in Python. None (native size) when the
+    source is not larger, cannot be probed, or is rotated (MoviePy applies
+    target_resolution before its rotation handling).
+    """
+    info = _ffprobe_video_stream(path)
+    size = _ffprobe_size(path)
+    if not info or not size or size != (info.get("width"), info.get("height")):
+        return None
+    sw, sh = size
+    scale = max(W / sw, H / sh)
+    if scale >= 1.0:
+        return None
+    return math.ceil(sh * scale), math.ceil(sw * scale)
+
+
+def _blurred_cover_background(pil_img, W: int, H: int, blur_radius: float):
+    """Cover-scale `pil_img` to W x H, blur it and center-crop; returns an RGB array.
+
+    With OpenCV available (opencv-python is optional) the resize uses
+    INTER_AREA and the blur its vectorized separable Gaussian; the blur hides
+    the softer resampling. Otherwise Pillow's LANCZOS resize and GaussianBlur
+    are used. Both take the radius as the standard deviation.
+    """
+    import numpy as np
+    from PIL import Image, ImageFilter
+
+    try:
+        import cv2
+    except ImportError:
+        cv2 = None
+
+    scale = max(W / pil_img.width, H / pil_img.height)
+    newsize = (int(pil_img.width * scale), int(pil_img.height * scale))
+    radius = int(blur_radius or 0)
+    if cv2 is not None:
+        arr = cv2.resize(np.asarray(pil_img), newsize, interpolation=cv2.INTER_AREA)
+        if radius > 0:
+            arr = cv2.GaussianBlur(arr, (0, 0), sigmaX=float(radius))
+    else:
+        pil_img = pil_img.resize(newsize, Image.LANCZOS)
+        if radius > 0:
+            pil_img = pil_img.filter(ImageFilter.GaussianBlur(radius=radius))
+        arr = np.asarray(pil_img)
+    left = max(0, (arr.shape[1] - W) // 2)
+    top = max(0, (arr.shape[0] - H) // 2)
+    return np.ascontiguousarray(arr[top:top + H, left:left + W])
+
+
+def _prepare_bgm(
+    mp: SimpleNamespace,
+    bgm_path: Path,
+    duration: float,
+    fade_in: float,
+    fade_out: float,
+):
+    """Open the BGM as a MoviePy clip fitted to `duration`: looped or trimmed, then faded.
+
+    Fades are clamped to half the duration. The track is rendered once by
+    ffmpeg into a WAV that MoviePy only reads back; MoviePy's loop/fade fx
+    chain (evaluated per audio chunk in Python) is the fallback. Returns
+    (audio clip, temp dir or None); the caller cleans up the temp dir,
+    which holds the rendered track.
+    """
+    # Clamp fades
+    max_fade = duration / 2.0
+    fi = min(float(fade_in), max_fade)
+    fo = min(float(fade_out), max_fade)
+
+    if mp.ffmpeg_binary:
+        loop_tmp = tempfile.TemporaryDirectory(prefix="ve_bgm_", dir=_fast_tmp(), ignore_cleanup_errors=True)
+        try:
+            track = _stream_loop_audio(bgm_path, duration, Path(loop_tmp.name), fi, fo, ffmpeg=mp.ffmpeg_binary)
+            return mp.AudioFileClip(str(track)), loop_tmp
+        except (OSError, RuntimeError):
+            loop_tmp.cleanup()
+
+    audio = mp.AudioFileClip(str(bgm_path))
+    # Ensure audio is at least `duration` long by looping if necessary
+    if audio.duration < duration:
+        if mp.audio_loop is not None:
+            audio = mp.audio_loop(audio, duration=duration)
+        else:
+            audio = audio.with_effects([mp.AudioLoopClass(duration=duration)])
+    else:
+        audio = audio.subclip(0, duration)
+
+    if fi > 0:
+        if mp.audio_fadein is not None:
+            audio = mp.audio_fadein(audio, fi)
+        elif mp.AudioFadeInClass is not None:
+            audio = audio.with_effects([mp.AudioFadeInClass(fi)])
+    if fo > 0:
+        if mp.audio_fadeout is not None:
+            audio = mp.audio_fadeout(audio, fo)
+        elif mp.AudioFadeOutClass is not None:
+            audio = audio.with_effects([mp.AudioFadeOutClass(fo)])
+    return audio, None
+
+
+def _set_clip_position(clip, pos):
+    """clip.set_position (MoviePy 1.x) or with_position (2.x); the clip itself if neither works."""
+    try:
+        return clip.set_position(pos)
     except Exception:
         pass
+    try:
+        return clip.with_position(pos)
+    except Exception:
+        return clip
 
 
-def _write_videofile_with_fallback(clip, output_path: Path, write_kwargs: dict) -> None:
-    """Write a video file, falling back to libx264 if hardware encoder fails silently."""
-    # Some MoviePy versions have different write_videofile signatures; call with minimal kwargs.
-    clip.write_videofile(str(output_path), **write_kwargs)
+def _set_clip_duration(clip, duration):
+    """clip.set_duration (MoviePy 1.x) or with_duration (2.x); the clip itself if neither works."""
+    try:
+        return clip.set_duration(duration)
+    except Exception:
+        pass
+    try:
+        return clip.with_duration(duration)
+    except Exception:
+        return clip
+
 
+def _close_clip_safe(c):
     try:
-        if output_path.exists() and output_path.stat().st_size > 0:
-            return
+        c.close()
     except Exception:
         pass
 
-    # If file is missing/empty and codec wasn't libx264, retry with libx264
-    codec = write_kwargs.get("codec")
-    if codec and codec != "libx264":
-        fallback_kwargs = dict(write_kwargs)
-        fallback_kwargs["codec"] = "libx264"
-        clip.write_videofile(str(output_path), **fallback_kwargs)
 
+def _write_videofile_with_fallback(
+    clip,
+    output_path: Path,
+    write_kwargs: dict,
+    encoder_preset: Optional[str] = None,
+    tune: Optional[str] = None,
+) -> None:
+    """Write a video file, falling back to libx264 if hardware encoder fails silently."""
+    try:
+        # Some MoviePy versions have different write_videofile signatures; call with minimal kwargs.
+        clip.write_videofile(str(output_path), **write_kwargs)
+
+        try:
+            if output_path.exists() and output_path.stat().st_size > 0:
+                return
+        except Exception:
+            pass
+
+        # If file is missing/empty and codec wasn't libx264, retry with libx264
+        codec = write_kwargs.get("codec")
+        if codec and codec != "libx264":
+            fallback_kwargs = dict(write_kwargs)
+            fallback_kwargs.update(_moviepy_encoder_kwargs("libx264", encoder_preset, tune))
+            clip.write_videofile(str(output_path), **fallback_kwargs)
+    finally:
+        # MoviePy only removes its temp audio after a successful write
+        temp_audio = write_kwargs.get("temp_audiofile")
+        if temp_audio:
+            try:
+                os.remove(temp_audio)
+            except OSError:
+                pass
+
+
+def _moviepy_temp_audiofile() -> str:
+    """Unique path for MoviePy's intermediate audio track on fast (RAM-backed) storage.
+
+    MoviePy otherwise writes it next to the output file, which may be a slow
+    or synced disk.
+    """
+    fd, path = tempfile.mkstemp(prefix="ve_audio_", suffix=".m4a", dir=_fast_tmp())
+    os.close(fd)
+    return path
+
+
+def _moviepy_encoder_kwargs(
+    codec: Optional[str],
+    encoder_preset: Optional[str] = None,
+    tune: Optional[str] = None,
+) -> dict:
+    """Return write_videofile codec/preset/ffmpeg_params for the given encoder.
 
-def _compat_ffmpeg_params() -> list[str]:
+    Applies the same encoder tuning as the direct ffmpeg path
+    (`_get_ffmpeg_encoder_args`). MoviePy always emits its own `-c:v` and
+    `-preset`, so those are passed as keyword arguments instead of params.
+    `tune` (e.g. "stillimage", "film") only applies to libx264.
+    """
+    codec = codec or "libx264"
+    enc_args = _get_ffmpeg_encoder_args(codec, encoder_preset)[2:]  # drop "-c:v <codec>"
+    kwargs: dict = {"codec": codec}
+    if "-preset" in enc_args:
+        i = enc_args.index("-preset")
+        kwargs["preset"] = enc_args[i + 1]
+        del enc_args[i:i + 2]
+    if tune and codec == "libx264":
+        enc_args += ["-tune", tune]
+    if not _is_hw_codec(codec):
+        # MoviePy emits no -threads unless asked; give the encoder every core
+        kwargs["threads"] = max(1, os.cpu_count() or 1)
+    kwargs["ffmpeg_params"] = enc_args + _compat_ffmpeg_params(codec)
+    return kwargs
+
+
+def _compat_ffmpeg_params(codec: Optional[str] = None) -> list[str]:
     """Return ffmpeg params for broad playback compatibility."""
     return [
-        "-pix_fmt", "yuv420p",
-        "-profile:v", "main",
-        "-level", "4.1",
+        "-pix_fmt", _output_pix_fmt(codec),
+        *_sw_profile_args(codec or "libx264"),
         "-movflags", "+faststart",
     ]
 
 
+def _output_pix_fmt(codec: Optional[str]) -> str:
+    """4:2:0 pixel format to feed the encoder.
+
+    QSV only accepts nv12 and NVENC takes it natively; handing them nv12
+    avoids a conversion (or a rejected input). Everything else gets yuv420p.
+    """
+    if codec and ("nvenc" in codec or "qsv" in codec):
+        return "nv12"
+    return "yuv420p"
+
+
+_HW_CODEC_MARKERS = ("nvenc", "qsv", "amf", "videotoolbox")
+# Consumer NVIDIA drivers allow a limited number of concurrent NVENC sessions.
+_MAX_HW_ENCODE_SESSIONS = 6
+
+
+def _is_hw_codec(codec: Optional[str]) -> bool:
+    return bool(codec) and any(m in codec for m in _HW_CODEC_MARKERS)
+
+
+def _encoder_cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME", "").strip()
+    return (Path(base) if base else Path.home() / ".cache") / "video_engine" / "encoders.json"
+
+
+def _parse_encoders(text: str) -> dict[str, list[str]]:
+    """Split `ffmpeg -encoders` output into hardware and software video encoders."""
+    hw: list[str] = []
+    sw: list[str] = []
+    listing = False
+    for line in text.splitlines():
+        parts = line.split()
+        if not listing:
+            listing = bool(parts) and parts[0].startswith("---")
+            continue
+        if len(parts) < 2 or not parts[0].startswith("V"):
+            continue
+        (hw if _is_hw_codec(parts[1]) else sw).append(parts[1])
+    return {"hw": hw, "sw": sw}
+
+
+def detect_encoders(ffmpeg_path: str) -> dict[str, list[str]]:
+    """Return {"hw": [...], "sw": [...]} video encoders supported by ffmpeg_path.
+
+    The probe result is cached as JSON in ~/.cache/video_engine/encoders.json,
+    keyed by the binary's path, mtime and size, so `ffmpeg -encoders` only
+    runs again after ffmpeg is replaced or upgraded.
+    """
+    st = os.stat(ffmpeg_path)
+    key = [str(ffmpeg_path), st.st_mtime_ns, st.st_size]
+    cache_path = _encoder_cache_path()
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    entry = cache.get(str(ffmpeg_path))
+    if isinstance(entry, dict) and entry.get("key") == key:
+        return {"hw": list(entry.get("hw", [])), "sw": list(entry.get("sw", []))}
+
+    result = subprocess.run(
+        [ffmpeg_path, "-hide_banner", "-encoders"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    encoders = _parse_encoders(result.stdout or "")
+    if result.returncode == 0:
+        cache[str(ffmpeg_path)] = {"key": key, **encoders}
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(cache), encoding="utf-8")
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return encoders
+
+
 @lru_cache(maxsize=1)
 def _select_video_encoder() -> Optional[str]:
     """Pick a hardware video encoder if available, else None.
@@ -229,23 +594,15 @@ def _select_video_encoder() -> Optional[str]:
         return None  # Explicitly disabled
 
     # Default: Auto-detect hardware encoder
-    ffmpeg = shutil.which("ffmpeg")
+    ffmpeg = _ffmpeg_exe()
     if not ffmpeg:
         return None
 
     try:
-        result = subprocess.run(
-            [ffmpeg, "-hide_banner", "-encoders"],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        encoders_text = result.stdout or ""
+        hw_encoders = detect_encoders(ffmpeg)["hw"]
     except Exception:
         return None
 
-    encoders = encoders_text.splitlines()
-
     # Preferred encoder order by platform
     if os.name == "nt":
         candidates = ["h264_nvenc", "h264_qsv", "h264_amf"]
@@ -255,23 +612,59 @@ def _select_video_encoder() -> Optional[str]:
         candidates = ["h264_nvenc", "h264_qsv", "h264_amf", "h264_videotoolbox"]
 
     for cand in candidates:
-        for line in encoders:
-            if cand in line:
-                return cand
+        if cand in hw_encoders and _hw_encoder_works(ffmpeg, cand):
+            return cand
     return None
 
 
-def _get_ffmpeg_encoding_preset() -> str:
+def _resolve_video_encoder(hwaccel: Optional[str] = "auto") -> Optional[str]:
+    """Map a render function's `hwaccel` argument to an ffmpeg video encoder.
+
+    "auto" defers to `_select_video_encoder` (environment overrides
+    included); "none"/None means libx264 (returned as None); anything else
+    is taken as an encoder name such as "h264_nvenc".
+    """
+    choice = (hwaccel or "none").strip().lower()
+    if choice == "auto":
+        return _select_video_encoder()
+    if choice in ("none", "off", "cpu", "libx264"):
+        return None
+    return choice
+
+
+def _hw_encoder_works(ffmpeg_path: str, codec: str) -> bool:
+    """Encode one tiny frame with codec to confirm the device is actually usable.
+
+    `ffmpeg -encoders` lists every encoder compiled in, including NVENC on
+    machines without an NVIDIA GPU; picking such an encoder would make the
+    render fail or silently fall back per clip.
+    """
+    try:
+        proc = subprocess.run(
+            [
+                ffmpeg_path, "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+                "-frames:v", "1", "-c:v", codec, "-f", "null", "-",
+            ],
+            capture_output=True,
+            timeout=20,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return proc.returncode == 0
+
+
+def _get_ffmpeg_encoding_preset(default: Optional[str] = None) -> str:
     """Get ffmpeg encoding preset from environment or return default.
     
     Supports:
     - VIDEO_ENGINE_FFMPEG_PRESET: "ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "placebo"
-    - Default: "fast" for CPU, automatic for hardware
+    - Default: `default` (the render preset's choice) or "fast" for CPU, automatic for hardware
     """
     preset = os.environ.get("VIDEO_ENGINE_FFMPEG_PRESET", "").strip()
     if preset:
         return preset
-    return "fast"
+    return default or "fast"
 
 
 def _get_ffmpeg_crf() -> int:
@@ -304,6 +697,128 @@ def _get_filter_scale() -> float:
     return 1.0
 
 
+def _get_clip_parallelism(codec: Optional[str]) -> int:
+    """Return how many per-clip ffmpeg encodes may run at once.
+
+    VIDEO_ENGINE_CONCAT_PARALLEL overrides the value (1 = sequential).
+    Hardware encoders are capped by the encoder session limit, libx264 by CPU count.
+    """
+    val = os.environ.get("VIDEO_ENGINE_CONCAT_PARALLEL", "").strip()
+    if val.isdigit() and int(val) >= 1:
+        return int(val)
+    cpus = os.cpu_count() or 1
+    if _is_hw_codec(codec):
+        return max(1, min(cpus, _MAX_HW_ENCODE_SESSIONS))
+    return cpus
+
+
+def _encoder_thread_args(codec: Optional[str], workers: int) -> list[str]:
+    """Split the CPU between concurrent software encodes.
+
+    Each libx264 instance otherwise sizes its thread pool for the whole
+    machine, so N parallel clips would oversubscribe the cores N-fold.
+    """
+    if workers <= 1 or _is_hw_codec(codec):
+        return []
+    cpus = os.cpu_count() or 1
+    return ["-threads", str(max(1, cpus // workers))]
+
+
+def _get_cache_max_bytes() -> int:
+    """Return the clip cache size limit (VIDEO_ENGINE_CACHE_MAX_MB, default 5 GB; 0 disables)."""
+    val = os.environ.get("VIDEO_ENGINE_CACHE_MAX_MB", "").strip()
+    if val.isdigit():
+        return int(val) * 1024 * 1024
+    return 5 * 1024 * 1024 * 1024
+
+
+def _clip_cache_key(source: Path | list[Path], cmd: list[str], tmpdir: str) -> str:
+    """Digest of the source file identities and every encode option in cmd.
+
+    Paths under tmpdir (outputs, staged/converted inputs) and the source
+    paths themselves are excluded so the key is stable across runs. So is
+    `-threads N`, which follows the timeline's clip count, not the output.
+    """
+    cmd = list(cmd)
+    while "-threads" in cmd:
+        i = cmd.index("-threads")
+        del cmd[i:i + 2]
+    sources = source if isinstance(source, list) else [source]
+    h = hashlib.blake2b(digest_size=20)
+    parts: list[str] = []
+    for src_path in sources:
+        st = src_path.stat()
+        parts.extend([str(src_path.resolve()), str(st.st_mtime_ns), str(st.st_size)])
+    src_args = {str(src_path) for src_path in sources}
+    parts.extend(a for a in cmd if a not in src_args and not a.startswith(tmpdir))
+    h.update("\0".join(parts).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _store_in_cache(src: Path, cache_path: Path) -> None:
+    """Link or copy src into the clip cache atomically.
+
+    The segment is written to a temp name in the cache dir and renamed into
+    place, so an interrupted copy never leaves a truncated `<key>.ts` behind.
+    """
+    tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        _link_or_copy(src, tmp)
+        os.replace(tmp, cache_path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _prune_clip_cache(cache_dir: Path, max_bytes: int) -> None:
+    """Delete least recently used segments until the cache fits max_bytes."""
+    try:
+        entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(cache_dir) if e.name.endswith(".ts")]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# RAM-backed temp dirs are only used when they have at least this much room.
+_FAST_TMP_MIN_FREE = 1024 * 1024 * 1024
+
+
+def _fast_tmp() -> str:
+    """Return a directory for intermediates, preferring RAM-backed storage.
+
+    Order: $XDG_RUNTIME_DIR, /dev/shm, then tempfile.gettempdir(). RAM-backed
+    candidates must be writable and have _FAST_TMP_MIN_FREE bytes available
+    (container /dev/shm is often only 64 MB).
+    """
+    if os.name != "nt":
+        for cand in (os.environ.get("XDG_RUNTIME_DIR", "").strip(), "/dev/shm"):
+            if not cand or not os.path.isdir(cand) or not os.access(cand, os.W_OK | os.X_OK):
+                continue
+            try:
+                if shutil.disk_usage(cand).free >= _FAST_TMP_MIN_FREE:
+                    return cand
+            except OSError:
+                continue
+    return tempfile.gettempdir()
+
+
 def _stage_media_path(path: Path, tmpdir: str, idx: int) -> Path:
     """Stage OneDrive media to a local temp path to avoid placeholder stalls."""
     if "OneDrive" in str(path) or "OneDrive" in str(path.resolve()):
@@ -315,9 +830,32 @@ def _stage_media_path(path: Path, tmpdir: str, idx: int) -> Path:
     return path
 
 
-def _build_video_input_opts() -> list[str]:
+# Decoder matching each hardware encoder, so decode runs on the same device.
+_HWACCEL_FOR_CODEC = (
+    ("nvenc", "cuda"),
+    ("qsv", "qsv"),
+    ("amf", "d3d11va"),
+    ("videotoolbox", "videotoolbox"),
+)
+
+
+def _hwaccel_for_codec(codec: Optional[str]) -> str:
+    """Return the -hwaccel value paired with the encoder ("auto" for CPU encoders).
+
+    Decoded frames are still downloaded to system memory because the
+    composition filters (blur, overlay, fades) run on the CPU.
+    """
+    for marker, hwaccel in _HWACCEL_FOR_CODEC:
+        if codec and marker in codec:
+            if hwaccel == "d3d11va" and os.name != "nt":
+                break  # D3D11 only exists on Windows
+            return hwaccel
+    return "auto"
+
+
+def _build_video_input_opts(codec: Optional[str] = None) -> list[str]:
     return [
-        "-hwaccel", "auto",
+        "-hwaccel", _hwaccel_for_codec(codec),
         "-thread_queue_size", "512",
         "-ignore_editlist", "1",
         "-fflags", "+genpts+igndts",
@@ -329,9 +867,9 @@ def _build_video_input_opts() -> list[str]:
     ]
 
 
-def _build_base_cmd(vf: str, use_dur: float, fps: int) -> list[str]:
+def _build_base_cmd(vf: str, use_dur: float, fps: int, codec: Optional[str] = None) -> list[str]:
     return [
-        "ffmpeg", "-y",
+        _ffmpeg_exe(), "-y",
         "-fflags", "+genpts",
         "-t", str(use_dur),
         "-r", str(int(fps)),
@@ -339,17 +877,62 @@ def _build_base_cmd(vf: str, use_dur: float, fps: int) -> list[str]:
         "-filter_complex_threads", "2",
         "-filter_complex", f"{vf}[v]",
         "-map", "[v]",
-        "-pix_fmt", "yuv420p",
+        "-pix_fmt", _output_pix_fmt(codec),
+    ]
+
+
+def _sw_profile_args(codec: Optional[str]) -> list[str]:
+    """Profile/level pinning for software encoders (hardware encoders pick their own)."""
+    if codec and not _is_hw_codec(codec):
+        return ["-profile:v", "main", "-level", "4.1"]
+    return []
+
+
+def _still_tune_args(codec: Optional[str]) -> list[str]:
+    """x264 tuning for looped stills (photo segments); other encoders get nothing."""
+    if not codec or codec == "libx264":
+        return ["-tune", "stillimage"]
+    return []
+
+
+def _ts_segment_args(codec: Optional[str], out_clip: Path) -> list[str]:
+    """Output args writing an MPEG-TS segment for the concat: protocol."""
+    args = ["-bsf:v", "h264_mp4toannexb"] if codec and "264" in codec else []
+    return args + ["-f", "mpegts", str(out_clip)]
+
+
+def _ts_concat_input(clip_paths: list[Path]) -> list[str]:
+    """Input args joining MPEG-TS segments with the concat protocol (byte-level, no demuxer).
+
+    Used directly as the video input of the final mux, so the joined stream
+    is remuxed only once.
+    """
+    return [
+        "-thread_queue_size", "1024",
+        "-fflags", "+genpts",
+        "-i", "concat:" + "|".join(str(p) for p in clip_paths),
     ]
 
 
 def _write_concat_list(paths: list[Path], list_path: Path) -> None:
-    list_path.write_text("\n".join([f"file '{p.as_posix()}'" for p in paths]), encoding="utf-8")
+    """Write an ffmpeg concat-demuxer list with a single write call.
+
+    Single quotes in paths are escaped as '\\'' per the concat list syntax.
+    """
+    buf = b"".join(
+        b"file '%s'\n" % os.fsencode(p.as_posix()).replace(b"'", b"'\\''")
+        for p in paths
+    )
+    fd = os.open(list_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        os.write(fd, buf)
+    finally:
+        os.close(fd)
 
 
 def _build_audio_extract_cmd(staged_path: Path, use_dur: float, out_audio: Path) -> list[str]:
     return [
-        "ffmpeg", "-y",
+        _ffmpeg_exe(), "-y",
         "-i", str(staged_path),
         "-t", str(use_dur),
         "-vn",
@@ -362,12 +945,18 @@ def _build_audio_extract_cmd(staged_path: Path, use_dur: float, out_audio: Path)
     ]
 
 
-def _build_silence_audio_cmd(use_dur: float, out_audio: Path) -> list[str]:
+def _silence_audio_input(use_dur: float) -> list[str]:
     return [
-        "ffmpeg", "-y",
         "-f", "lavfi",
         "-t", str(use_dur),
         "-i", "anullsrc=channel_layout=stereo:sample_rate=44100",
+    ]
+
+
+def _build_silence_audio_cmd(use_dur: float, out_audio: Path) -> list[str]:
+    return [
+        _ffmpeg_exe(), "-y",
+        *_silence_audio_input(use_dur),
         "-ac", "2",
         "-ar", "44100",
         "-c:a", "pcm_s16le",
@@ -375,25 +964,95 @@ def _build_silence_audio_cmd(use_dur: float, out_audio: Path) -> list[str]:
     ]
 
 
-def _ensure_raster_photo(path: Path, tmpdir: str, idx: int) -> Path:
-    """Convert HEIC/HEIF to PNG for ffmpeg if needed."""
+def _ensure_raster_photo(path: Path, tmpdir: str, idx: int, cover: Optional[tuple[int, int]] = None) -> Path:
+    """Return a photo file ffmpeg can loop cheaply.
+
+    HEIC/HEIF is converted to PNG. With `cover`, a photo larger than needed
+    to cover that frame is downscaled once here (EXIF orientation applied,
+    as ffmpeg would): `-loop 1` decodes its input again for every output
+    frame, so a full-size camera JPEG would be decoded and scaled fps times
+    per second.
+    """
     ext = path.suffix.lower()
-    if ext not in (".heic", ".heif"):
+    is_heif = ext in (".heic", ".heif")
+    if not is_heif and cover is None:
         return path
     try:
-        from PIL import Image
-        out_path = Path(tmpdir) / f"photo_{idx:04d}.png"
-        if not out_path.exists():
-            with Image.open(path) as img:
-                img.save(out_path, format="PNG")
-        return out_path
+        from PIL import Image, ImageOps
+        with Image.open(path) as img:
+            w, h = img.size
+            if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+                w, h = h, w
+            scale = max(cover[0] / w, cover[1] / h) if cover else 1.0
+            if scale >= 1.0:
+                if not is_heif:
+                    return path
+                out_path = Path(tmpdir) / f"photo_{idx:04d}.png"
+                if not out_path.exists():
+                    img.save(out_path, format="PNG")
+                return out_path
+            out_path = Path(tmpdir) / f"photo_{idx:04d}.bmp"
+            if not out_path.exists():
+                size = (math.ceil(w * scale), math.ceil(h * scale))
+                # JPEG: let the decoder skip DCT detail we are about to discard
+                img.draft("RGB", size if (w, h) == img.size else size[::-1])
+                small = ImageOps.exif_transpose(img).convert("RGB")
+                small.resize(size, Image.LANCZOS).save(out_path, format="BMP")
+            return out_path
     except Exception:
         return path
 
 
+def _build_single_photo_cmd(
+    photo_path: Path,
+    output_path: Path,
+    duration: float,
+    fps: int,
+    bgm_path: Optional[Path],
+    fade_in: float,
+    fade_out: float,
+    codec: str,
+    encoder_preset: Optional[str] = None,
+) -> list[str]:
+    """ffmpeg command rendering one looped still (native size, made even) with optional BGM."""
+    cmd = [
+        _ffmpeg_exe(), "-y",
+        "-loop", "1", "-framerate", str(int(fps)), "-t", str(duration),
+        "-i", str(photo_path),
+    ]
+    if bgm_path is not None:
+        # Same fade clamping as the MoviePy path: at most half the duration each
+        fi = min(float(fade_in), duration / 2.0)
+        fo = min(float(fade_out), duration / 2.0)
+        afilter = ["anull"]
+        if fi > 0:
+            afilter.append(f"afade=t=in:st=0:d={fi}")
+        if fo > 0:
+            afilter.append(f"afade=t=out:st={duration - fo}:d={fo}")
+        cmd += [
+            "-stream_loop", "-1", "-i", str(bgm_path),
+            "-map", "0:v:0", "-map", "1:a:0",
+            "-af", ",".join(afilter),
+            "-c:a", "aac",
+        ]
+    else:
+        cmd += ["-an"]
+    cmd += [
+        "-t", str(duration),
+        "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2,setsar=1",
+        *_get_ffmpeg_encoder_args(codec, encoder_preset),
+        *_still_tune_args(codec),
+        "-pix_fmt", _output_pix_fmt(codec),
+        *_sw_profile_args(codec),
+        "-movflags", "+faststart",
+        str(output_path),
+    ]
+    return cmd
+
+
 def _build_audio_concat_cmd(audio_list_path: Path, audio_concat: Path) -> list[str]:
     return [
-        "ffmpeg", "-y",
+        _ffmpeg_exe(), "-y",
         "-f", "concat", "-safe", "0",
         "-i", str(audio_list_path),
         "-ac", "2",
@@ -403,18 +1062,37 @@ def _build_audio_concat_cmd(audio_list_path: Path, audio_concat: Path) -> list[s
     ]
 
 
+def _final_movflags() -> str:
+    """movflags for the delivered MP4.
+
+    Default +faststart rewrites the file once to move moov to the front.
+    VIDEO_ENGINE_FRAGMENTED_MP4=1 writes a fragmented MP4 instead (moov
+    built up front, no rewrite pass); some older players cannot seek it.
+    """
+    if os.environ.get("VIDEO_ENGINE_FRAGMENTED_MP4", "").strip() == "1":
+        return "+frag_keyframe+empty_moov+default_base_moof"
+    return "+faststart"
+
+
+def _clip_audio_input(audio_concat: Optional[Path], total_dur: float) -> list[str]:
+    """Input args for the clip audio track; silence when no clip has audio."""
+    if audio_concat is None:
+        return _silence_audio_input(total_dur)
+    return ["-i", str(audio_concat)]
+
+
 def _build_bgm_mix_cmd(
-    concat_out: Path,
-    audio_concat: Path,
+    clip_paths: list[Path],
+    audio_concat: Optional[Path],
     bgm_path: Path,
     total_dur: float,
     afilter: str,
     output_path: Path,
 ) -> list[str]:
     return [
-        "ffmpeg", "-y",
-        "-i", str(concat_out),
-        "-i", str(audio_concat),
+        _ffmpeg_exe(), "-y",
+        *_ts_concat_input(clip_paths),
+        *_clip_audio_input(audio_concat, total_dur),
         "-stream_loop", "-1",
         "-i", str(bgm_path),
         "-c:v", "copy",
@@ -424,30 +1102,34 @@ def _build_bgm_mix_cmd(
         "-map", "[out_audio]",
         "-t", str(total_dur),
         "-filter_complex", afilter,
-        "-movflags", "+faststart",
+        "-max_muxing_queue_size", "4096",
+        "-avoid_negative_ts", "make_zero",
+        "-movflags", _final_movflags(),
         "-fflags", "+genpts",
         str(output_path),
     ]
 
 
-def _build_mux_cmd(concat_out: Path, audio_concat: Path, total_dur: float, output_path: Path) -> list[str]:
+def _build_mux_cmd(clip_paths: list[Path], audio_concat: Optional[Path], total_dur: float, output_path: Path) -> list[str]:
     return [
-        "ffmpeg", "-y",
-        "-i", str(concat_out),
-        "-i", str(audio_concat),
+        _ffmpeg_exe(), "-y",
+        *_ts_concat_input(clip_paths),
+        *_clip_audio_input(audio_concat, total_dur),
         "-c:v", "copy",
         "-c:a", "aac",
         "-q:a", "8",
         "-map", "0:v:0",
         "-map", "1:a:0",
         "-t", str(total_dur),
-        "-movflags", "+faststart",
+        "-max_muxing_queue_size", "4096",
+        "-avoid_negative_ts", "make_zero",
+        "-movflags", _final_movflags(),
         "-fflags", "+genpts",
         str(output_path),
     ]
 
 
-def _get_ffmpeg_encoder_args(codec: Optional[str]) -> list[str]:
+def _get_ffmpeg_encoder_args(codec: Optional[str], encoder_preset: Optional[str] = None) -> list[str]:
     """Get ffmpeg encoder-specific arguments based on codec type.
     
     Returns list of command-line arguments for the encoder.
@@ -458,10 +1140,18 @@ def _get_ffmpeg_encoder_args(codec: Optional[str]) -> list[str]:
     args = ["-c:v", codec]
     
     if "nvenc" in codec:
-        # NVIDIA NVENC optimized settings
-        args.extend(["-preset", "fast"])  # fast, medium, slow
-        args.extend(["-rc", "vbr"])  # variable bitrate
-        args.extend(["-cq", "23"])  # quality 0-51 (lower=better, 23=default)
+        # NVIDIA NVENC settings
+        if os.environ.get("VIDEO_ENGINE_NVENC_MODE", "").strip().lower() == "final":
+            # Quality-oriented output
+            args.extend(["-preset", os.environ.get("VIDEO_ENGINE_NVENC_PRESET", "").strip() or "p4"])
+            args.extend(["-rc", "vbr"])  # variable bitrate
+            args.extend(["-cq", "23"])  # quality 0-51 (lower=better, 23=default)
+        else:
+            # Preview: fastest preset, low-latency tune, no B-frame lookahead
+            args.extend(["-preset", os.environ.get("VIDEO_ENGINE_NVENC_PRESET", "").strip() or "p1"])
+            args.extend(["-tune", "ll"])
+            args.extend(["-rc", "cbr", "-b:v", "3M"])
+            args.extend(["-bf", "0", "-g", "60"])
     elif "qsv" in codec:
         # Intel QuickSync Video settings
         args.extend(["-preset", "fast"])  # ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, placebo
@@ -474,7 +1164,7 @@ def _get_ffmpeg_encoder_args(codec: Optional[str]) -> list[str]:
         args.extend(["-b:v", "2000k"])  # bitrate
     elif codec == "libx264":
         # CPU-based x264 with fast preset
-        preset = _get_ffmpeg_encoding_preset()
+        preset = _get_ffmpeg_encoding_preset(encoder_preset)
         args.extend(["-preset", preset])
         crf = _get_ffmpeg_crf()
         args.extend(["-crf", str(crf)])
@@ -495,6 +1185,9 @@ def render_timeline(
     bgm_volume: float = float(DEFAULTS["bgm_volume"]),
     preserve_videos: bool = False,
     resolution: tuple[int, int] | None = None,
+    cache_dir: Optional[Path] = None,
+    encoder_preset: Optional[str] = None,
+    hwaccel: Optional[str] = "auto",
 ) -> None:
     """Render a sequence of ClipPlans into a single MP4 file by concatenation.
 
@@ -508,6 +1201,16 @@ def render_timeline(
 
     preserve_videos: when True, use the original video file's duration for video clips
     instead of restricting them to the planned duration. Defaults to False.
+
+    cache_dir: directory for reusing encoded clip segments across runs (ffmpeg
+    path only). None disables the cache.
+
+    encoder_preset: libx264 speed preset (e.g. "ultrafast" for previews);
+    defaults to "fast". VIDEO_ENGINE_FFMPEG_PRESET overrides it.
+
+    hwaccel: "auto" (default) encodes with a working hardware encoder when
+    one is found, "none" forces libx264, any other value is used as the
+    ffmpeg encoder name.
     """
     if not plans:
         raise ValueError("plans must be non-empty")
@@ -528,20 +1231,17 @@ def render_timeline(
                 bgm_volume=bgm_volume,
                 preserve_videos=preserve_videos,
                 resolution=resolution,
+                cache_dir=cache_dir,
+                encoder_preset=encoder_preset,
+                hwaccel=hwaccel,
             )
         except Exception as exc:
             print(f"[ffmpeg] render failed: {exc}", flush=True)
             raise
 
-    # Prefer the convenient editor import
-    try:
-        from moviepy.editor import ImageClip, VideoFileClip, concatenate_videoclips, AudioFileClip, CompositeVideoClip
-    except Exception:
-        # Fallback imports for different MoviePy structures
-        from moviepy.video.VideoClip import ImageClip  # type: ignore
-        from moviepy.video.io.VideoFileClip import VideoFileClip  # type: ignore
-        from moviepy.video.compositing.concatenate import concatenate_videoclips  # type: ignore
-        from moviepy.audio.io.AudioFileClip import AudioFileClip  # type: ignore
+    mp = _load_moviepy()
+    ImageClip, VideoFileClip = mp.ImageClip, mp.VideoFileClip
+    concatenate_videoclips, CompositeVideoClip = mp.concatenate_videoclips, mp.CompositeVideoClip
 
     # Determine target resolution
     # Default when not specified: 1280x720 (matches tests)
@@ -558,9 +1258,15 @@ def render_timeline(
             for p in plans:
                 if getattr(p, "kind", None) == "video":
                     path = Path(p.path)
-                    if path.exists() and path.is_file():
+                    size = _ffprobe_size(path) if path.is_file() else None
+                    if size:
+                        # One cached ffprobe instead of opening a full MoviePy reader
+                        vw, vh = size
+                        max_w = max(max_w, vw)
+                        max_h = max(max_h, vh)
+                    elif path.exists() and path.is_file():
                         try:
-                            vf_probe = VideoFileClip(str(path))
+                            vf_probe = VideoFileClip(str(path), audio=False)
                             try:
                                 vw, vh = vf_probe.size
                                 if not vw or not vh:
@@ -592,32 +1298,6 @@ def render_timeline(
     video_fadeout_func = None
     video_crop_func = None
 
-    # Audio fx initializations (similar to render_single_photo)
-    audio_loop = None
-    audio_fadein = None
-    audio_fadeout = None
-    AudioLoopClass = None
-    AudioFadeInClass = None
-    AudioFadeOutClass = None
-    try:
-        import moviepy.audio.fx.all as afx
-        audio_loop = getattr(afx, "audio_loop", None)
-        audio_fadein = getattr(afx, "audio_fadein", None)
-        audio_fadeout = getattr(afx, "audio_fadeout", None)
-    except Exception:
-        try:
-            from moviepy.audio.fx.AudioLoop import AudioLoop as AudioLoopClass
-        except Exception:
-            AudioLoopClass = None
-        try:
-            from moviepy.audio.fx.AudioFadeIn import AudioFadeIn as AudioFadeInClass
-        except Exception:
-            AudioFadeInClass = None
-        try:
-            from moviepy.audio.fx.AudioFadeOut import AudioFadeOut as AudioFadeOutClass
-        except Exception:
-            AudioFadeOutClass = None
-
     # Minimal photo composition helper: blurred background + centered foreground
     def compose_photo_fill_frame(imgclip, W: int, H: int, blur_radius: int = 0):
         try:
@@ -633,30 +1313,46 @@ def render_timeline(
 
         # Build blurred background via PIL if possible
         bg = None
+        bg_arr = None
         try:
-            from PIL import Image, ImageFilter
+            from PIL import Image
             import numpy as np
             pil_img = None
             try:
-                if hasattr(imgclip, 'filename') and getattr(imgclip, 'filename', None):
-                    pil_img = Image.open(imgclip.filename).convert("RGB")
-                else:
-                    arr = imgclip.get_frame(0)
-                    pil_img = Image.fromarray(arr)
+                # Reuse the pixels the ImageClip already decoded instead of
+                # opening and decoding the file a second time
+                src_arr = imgclip.get_frame(0)
+                pil_img = Image.fromarray(src_arr)
+                if pil_img.mode != "RGB":
+                    pil_img = pil_img.convert("RGB")
             except Exception:
                 pil_img = None
             if pil_img is not None:
-                scale = max(W / pil_img.width, H / pil_img.height)
-                newsize = (int(pil_img.width * scale), int(pil_img.height * scale))
-                pil_img = pil_img.resize(newsize, Image.LANCZOS)
-                if blur_radius and blur_radius > 0:
-                    pil_img = pil_img.filter(ImageFilter.GaussianBlur(radius=int(blur_radius)))
-                left = max(0, (pil_img.width - W) // 2)
-                top = max(0, (pil_img.height - H) // 2)
-                pil_img = pil_img.crop((left, top, left + W, top + H))
-                bg = ImageClip(np.array(pil_img))
+                bg_arr = _blurred_cover_background(pil_img, W, H, blur_radius)
+                bg = ImageClip(bg_arr)
         except Exception:
             bg = None
+            bg_arr = None
+
+        # Photos are static: composite once into a single frame so MoviePy does
+        # not re-blend both layers for every output frame. Masked (transparent)
+        # images keep the CompositeVideoClip path below.
+        if bg_arr is not None and getattr(imgclip, "mask", None) is None:
+            try:
+                fg_arr = np.asarray(pil_img)
+                contain = min(W / sw, H / sh)
+                if not (sh > sw and contain > 1):
+                    fg_size = (int(sw * contain), int(sh * contain))
+                    fg_arr = np.asarray(pil_img.resize(fg_size, Image.LANCZOS))
+                fh, fw = fg_arr.shape[:2]
+                left, top = (W - fw) // 2, (H - fh) // 2
+                canvas = bg_arr.copy()
+                y0, x0 = max(0, top), max(0, left)
+                y1, x1 = min(H, top + fh), min(W, left + fw)
+                canvas[y0:y1, x0:x1] = fg_arr[y0 - top:y1 - top, x0 - left:x1 - left, :3]
+                return _set_clip_duration(ImageClip(canvas), imgclip.duration)
+            except Exception:
+                pass
 
         try:
             if bg is None:
@@ -666,11 +1362,6 @@ def render_timeline(
         except Exception:
             bg = imgclip
 
-        try:
-            bg = bg.set_duration(imgclip.duration)
-        except Exception:
-            pass
-
         # Foreground: contain scale (avoid upscale for portrait)
         try:
             contain = min(W / sw, H / sh)
@@ -681,33 +1372,10 @@ def render_timeline(
         except Exception:
             fg = imgclip
 
-        try:
-            fg = fg.set_position(("center", "center"))
-        except Exception:
-            try:
-                fg = fg.set_position("center")
-            except Exception:
-                pass
-
-        try:
-            fg = fg.set_duration(imgclip.duration)
-        except Exception:
-            pass
-
-        try:
-            comp = CompositeVideoClip([bg.set_position((0, 0)), fg], size=(W, H))
-        except Exception:
-            try:
-                comp = CompositeVideoClip([bg, fg.set_position(("center", "center"))], size=(W, H))
-            except Exception:
-                comp = CompositeVideoClip([bg, fg])
-
-        try:
-            comp = comp.set_duration(imgclip.duration)
-        except Exception:
-            pass
-
-        return comp
+        # Layers inherit their timing from the composite; only it gets a duration
+        layers = [_set_clip_position(bg, (0, 0)), _set_clip_position(fg, ("center", "center"))]
+        comp = CompositeVideoClip(layers, size=(W, H))
+        return _set_clip_duration(comp, imgclip.duration)
 
     # Minimal video composition helper: blurred background + centered foreground (contain)
     def compose_video_fill_frame(vclip, W: int, H: int, blur_radius: int = 0):
@@ -725,24 +1393,14 @@ def render_timeline(
         # Build blurred background via first frame
         bg = None
         try:
-            from PIL import Image, ImageFilter
-            import numpy as np
+            from PIL import Image
             arr = None
             try:
                 arr = vclip.get_frame(0)
             except Exception:
                 arr = None
             if arr is not None:
-                pil_img = Image.fromarray(arr)
-                scale = max(W / pil_img.width, H / pil_img.height)
-                newsize = (int(pil_img.width * scale), int(pil_img.height * scale))
-                pil_img = pil_img.resize(newsize, Image.LANCZOS)
-                if blur_radius and blur_radius > 0:
-                    pil_img = pil_img.filter(ImageFilter.GaussianBlur(radius=int(blur_radius)))
-                left = max(0, (pil_img.width - W) // 2)
-                top = max(0, (pil_img.height - H) // 2)
-                pil_img = pil_img.crop((left, top, left + W, top + H))
-                bg = ImageClip(np.array(pil_img))
+                bg = ImageClip(_blurred_cover_background(Image.fromarray(arr), W, H, blur_radius))
         except Exception:
             bg = None
 
@@ -753,11 +1411,6 @@ def render_timeline(
         except Exception:
             bg = vclip
 
-        try:
-            bg = bg.set_duration(vclip.duration)
-        except Exception:
-            pass
-
         # Foreground: contain scale, keep full content visible; avoid upscaling
         try:
             contain = min(W / sw, H / sh)
@@ -768,33 +1421,10 @@ def render_timeline(
         except Exception:
             fg = vclip
 
-        try:
-            fg = fg.set_position(("center", "center"))
-        except Exception:
-            try:
-                fg = fg.set_position("center")
-            except Exception:
-                pass
-
-        try:
-            fg = fg.set_duration(vclip.duration)
-        except Exception:
-            pass
-
-        try:
-            comp = CompositeVideoClip([bg.set_position((0, 0)), fg], size=(W, H))
-        except Exception:
-            try:
-                comp = CompositeVideoClip([bg, fg.set_position(("center", "center"))], size=(W, H))
-            except Exception:
-                comp = CompositeVideoClip([bg, fg])
-
-        try:
-            comp = comp.set_duration(vclip.duration)
-        except Exception:
-            pass
-
-        return comp
+        # Layers inherit their timing from the composite; only it gets a duration
+        layers = [_set_clip_position(bg, (0, 0)), _set_clip_position(fg, ("center", "center"))]
+        comp = CompositeVideoClip(layers, size=(W, H))
+        return _set_clip_duration(comp, vclip.duration)
 
     def normalize_video_to_frame(vclip, W: int, H: int, preserve_native: bool = False):
         """For VIDEOS: ensure the clip fills W x H using cover-scaling and center-cropping.
@@ -804,12 +1434,8 @@ def render_timeline(
         """
         if preserve_native:
             try:
-                comp = CompositeVideoClip([vclip.set_position(("center", "center"))], size=(W, H))
-                try:
-                    comp = comp.set_duration(vclip.duration)
-                except Exception:
-                    pass
-                return comp
+                comp = CompositeVideoClip([_set_clip_position(vclip, ("center", "center"))], size=(W, H))
+                return _set_clip_duration(comp, vclip.duration)
             except Exception:
                 return vclip
 
@@ -866,31 +1492,38 @@ def render_timeline(
             except Exception:
                 pass
 
-        try:
-            r = r.set_duration(vclip.duration)
-        except Exception:
-            pass
-
         # Wrap in a CompositeVideoClip sized to the target frame to guarantee output
         try:
-            comp = CompositeVideoClip([r.set_position(("center", "center"))], size=(W, H))
-            try:
-                comp = comp.set_duration(r.duration)
-            except Exception:
-                pass
-            return comp
+            comp = CompositeVideoClip([_set_clip_position(r, ("center", "center"))], size=(W, H))
+            return _set_clip_duration(comp, vclip.duration)
         except Exception:
             return r
 
+    # Photos used by more than one plan are decoded (and shrunk) once and the
+    # pixel array is shared.
+    photo_uses = Counter(str(p.path) for p in plans if getattr(p, "kind", None) == "photo")
+    decoded_photos: dict[str, object] = {}
+    decode_lock = threading.Lock()
+
     clips = []
+    loop_tmp = None
     try:
         for p in plans:
             path = Path(p.path)
             if not path.exists() or not path.is_file():
                 raise FileNotFoundError(f"Clip not found: {path}")
+
+        def build_clip(p):
+            path = Path(p.path)
             dur = float(p.duration)
             if p.kind == "photo":
-                c = ImageClip(str(path))
+                if photo_uses[str(p.path)] > 1:
+                    with decode_lock:
+                        if str(p.path) not in decoded_photos:
+                            decoded_photos[str(p.path)] = _load_photo_array(path, (target_W, target_H))
+                    c = ImageClip(decoded_photos[str(p.path)])
+                else:
+                    c = ImageClip(_load_photo_array(path, (target_W, target_H)))
                 try:
                     c = c.with_duration(dur)
                 except Exception:
@@ -927,10 +1560,15 @@ def render_timeline(
                                 filled = filled.fadeout(t)
                             except Exception:
                                 pass
-                clips.append(filled)
+                return filled
             else:
                 # video: fill the frame by cover-scaling and center-cropping (no blurred background)
-                vf = VideoFileClip(str(path))
+                # Source audio is never used (BGM or silence), so skip its reader
+                vf = VideoFileClip(
+                    str(path),
+                    audio=False,
+                    target_resolution=_video_decode_resolution(path, target_W, target_H),
+                )
                 try:
                     # Source duration may be None or 0; be defensive
                     src_dur = getattr(vf, "duration", None)
@@ -1002,48 +1640,40 @@ def render_timeline(
                                 except Exception:
                                     pass
 
-                    clips.append(filled)
+                    return filled
                 except Exception:
                     # ensure we close vf on error to avoid leaks
                     _close_clip_safe(vf)
                     raise
 
-        final = concatenate_videoclips(clips, method="compose")
+        # Decoding, resizing and blurring run in C code that releases the GIL,
+        # so clips are composed concurrently; each reader stays with its clip.
+        workers = max(1, min(len(plans), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(build_clip, p) for p in plans]
+        error = None
+        for fut in futures:
+            try:
+                clips.append(fut.result())
+            except Exception as exc:
+                # Keep collecting so every built clip is closed in `finally`
+                error = error or exc
+        if error is not None:
+            raise error
+
+        # Every clip is normally already canvas-sized; "chain" then passes frames
+        # through instead of compositing each one onto a new canvas.
+        same_size = all(tuple(getattr(c, "size", ())) == (target_W, target_H) for c in clips)
+        try:
+            final = concatenate_videoclips(clips, method="chain" if same_size else "compose")
+        except Exception:
+            if not same_size:
+                raise
+            final = concatenate_videoclips(clips, method="compose")
 
         audio_clip = None
         if bgm_path is not None:
-            audio = AudioFileClip(str(bgm_path))
-            total_dur = final.duration
-            if audio.duration < total_dur:
-                if audio_loop is not None:
-                    audio = audio_loop(audio, duration=total_dur)
-                elif AudioLoopClass is not None:
-                    audio = audio.with_effects([AudioLoopClass(duration=total_dur)])
-                else:
-                    n = int(total_dur / audio.duration) + 1
-                    new_audio = audio
-                    for _ in range(n - 1):
-                        new_audio = new_audio + audio
-                    audio = new_audio.subclip(0, float(total_dur))
-            else:
-                audio = audio.subclip(0, float(total_dur))
-
-            max_fade = float(total_dur) / 2.0
-            fi = min(float(fade_in), max_fade)
-            fo = min(float(fade_out), max_fade)
-
-            if fi > 0:
-                if audio_fadein is not None:
-                    audio = audio_fadein(audio, fi)
-                elif AudioFadeInClass is not None:
-                    audio = audio.with_effects([AudioFadeInClass(fi)])
-            if fo > 0:
-                if audio_fadeout is not None:
-                    audio = audio_fadeout(audio, fo)
-                elif AudioFadeOutClass is not None:
-                    audio = audio.with_effects([AudioFadeOutClass(fo)])
-
-            audio_clip = audio
+            audio_clip, loop_tmp = _prepare_bgm(mp, bgm_path, float(final.duration), fade_in, fade_out)
             # set audio
             try:
                 final = final.set_audio(audio_clip)
@@ -1059,14 +1689,16 @@ def render_timeline(
         # Ensure output dir exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        codec = _select_video_encoder()
-        write_kwargs = dict(fps=int(fps), codec=codec or "libx264", ffmpeg_params=_compat_ffmpeg_params())
+        codec = _resolve_video_encoder(hwaccel)
+        # Photo-only timelines are still images with crossfades; real footage wants "film"
+        tune = "film" if any(p.kind == "video" for p in plans) else "stillimage"
+        write_kwargs = dict(fps=int(fps), **_moviepy_encoder_kwargs(codec, encoder_preset, tune))
         if audio_clip is not None:
-            write_kwargs.update(dict(audio=True, audio_codec="aac"))
+            write_kwargs.update(dict(audio=True, audio_codec="aac", temp_audiofile=_moviepy_temp_audiofile()))
         else:
             write_kwargs.update(dict(audio=False))
 
-        _write_videofile_with_fallback(final, output_path, write_kwargs)
+        _write_videofile_with_fallback(final, output_path, write_kwargs, encoder_preset, tune)
     finally:
         # Close clips to avoid file locks
         for c in clips:
@@ -1075,10 +1707,66 @@ def render_timeline(
             _close_clip_safe(final)
         except Exception:
             pass
+        if loop_tmp is not None:
+            loop_tmp.cleanup()
+
+
+def _stream_loop_audio(
+    audio_path: Path,
+    duration: float,
+    tmpdir: Path,
+    fade_in: float = 0.0,
+    fade_out: float = 0.0,
+    ffmpeg: Optional[str] = None,
+) -> Path:
+    """Repeat (or trim) an audio file to `duration` seconds with ffmpeg -stream_loop, then fade.
+
+    Returns a PCM WAV in tmpdir; ffmpeg does the sample copying and fades
+    instead of a chain of MoviePy audio clips.
+    """
+    out_path = tmpdir / "bgm_loop.wav"
+    afilter = ["anull"]
+    if fade_in > 0:
+        afilter.append(f"afade=t=in:st=0:d={fade_in}")
+    if fade_out > 0:
+        afilter.append(f"afade=t=out:st={duration - fade_out}:d={fade_out}")
+    _run_ffmpeg([
+        ffmpeg or _ffmpeg_exe() or "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-stream_loop", "-1",
+        "-i", str(audio_path),
+        "-t", str(duration),
+        "-vn", "-af", ",".join(afilter),
+        "-c:a", "pcm_s16le",
+        str(out_path),
+    ])
+    return out_path
+
+
+@lru_cache(maxsize=1)
+def _bundled_ffmpeg_exe() -> Optional[str]:
+    """Return the ffmpeg binary shipped with imageio-ffmpeg, if installed."""
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return None
+    try:
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def _ffmpeg_exe() -> Optional[str]:
+    """Locate ffmpeg: PATH first, then the imageio-ffmpeg bundle.
+
+    MoviePy already depends on imageio-ffmpeg, so the bundled binary lets the
+    direct ffmpeg pipeline run on machines without a system ffmpeg instead of
+    falling back to MoviePy's per-frame Python loop.
+    """
+    return shutil.which("ffmpeg") or _bundled_ffmpeg_exe()
 
 
 def _ffmpeg_available() -> bool:
-    return shutil.which("ffmpeg") is not None
+    return _ffmpeg_exe() is not None
 
 
 def _run_ffmpeg(cmd: list[str], progress_total_sec: float | None = None, progress_label: str | None = None) -> None:
@@ -1146,40 +1834,155 @@ def _run_ffmpeg(cmd: list[str], progress_total_sec: float | None = None, progres
 
 
 def _ffprobe_size(path: Path) -> tuple[int, int] | None:
+    """Display size of the first video stream (rotation applied), from the cached probe."""
+    info = _ffprobe_video_stream(path)
+    if not info:
+        return None
+    try:
+        w, h = int(info["width"]), int(info["height"])
+        rotation = _stream_rotation(info)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not w or not h:
+        return None
+    # ffmpeg (and MoviePy) autorotate, so portrait phone clips swap dimensions
+    return (h, w) if abs(rotation) % 180 == 90 else (w, h)
+
+
+def _max_video_display_size(plans: list) -> tuple[int, int] | None:
+    """Largest width and height over the timeline's videos, in display orientation.
+
+    Used as the preserve_videos canvas. Rotated phone clips count with
+    their display size (a rotate=90 1920x1080 clip is 1080x1920). None when
+    no video could be probed.
+    """
+    max_w, max_h = 0, 0
+    for p in plans:
+        if getattr(p, "kind", None) == "video":
+            size = _ffprobe_size(Path(p.path))
+            if size:
+                max_w = max(max_w, size[0])
+                max_h = max(max_h, size[1])
+    return (max_w, max_h) if max_w > 0 and max_h > 0 else None
+
+
+def _stream_rotation(info: dict) -> int:
+    """Rotation in degrees from a probed stream's `rotate` tag or display matrix side data."""
+    rotation = (info.get("tags") or {}).get("rotate") or 0
+    for side_data in info.get("side_data_list") or []:
+        rotation = side_data.get("rotation", rotation)
+    return int(float(rotation))
+
+
+def _ffprobe_duration(path: Path) -> float | None:
     ffprobe = shutil.which("ffprobe")
     if not ffprobe:
         return None
     proc = subprocess.run(
-        [ffprobe, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x", str(path)],
+        [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
         capture_output=True,
         text=True,
     )
     if proc.returncode != 0 or not proc.stdout:
         return None
     try:
-        w_s, h_s = proc.stdout.strip().split("x")
-        return int(w_s), int(h_s)
+        return float(proc.stdout.strip())
     except Exception:
         return None
 
 
-def _ffprobe_duration(path: Path) -> float | None:
+
+
+@lru_cache(maxsize=256)
+def _ffprobe_video_stream_cached(path: str, mtime_ns: int, size: int) -> Optional[dict]:
     ffprobe = shutil.which("ffprobe")
     if not ffprobe:
-        return None
+        # imageio-ffmpeg ships no ffprobe; read the same fields in-process instead
+        return _pyav_video_stream(path)
     proc = subprocess.run(
-        [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+        [
+            ffprobe, "-v", "error", "-select_streams", "v:0",
+            "-show_entries",
+            "stream=codec_name,width,height,pix_fmt,r_frame_rate:stream_tags=rotate:stream_side_data=rotation",
+            "-of", "json", path,
+        ],
         capture_output=True,
         text=True,
     )
     if proc.returncode != 0 or not proc.stdout:
         return None
     try:
-        return float(proc.stdout.strip())
+        streams = json.loads(proc.stdout).get("streams") or []
+    except ValueError:
+        return None
+    return streams[0] if streams else None
+
+
+def _pyav_video_stream(path: str) -> Optional[dict]:
+    """The `_ffprobe_video_stream` fields read with PyAV (optional `av` package).
+
+    Covers codec, size, pixel format, frame rate and a legacy `rotate` tag;
+    display-matrix rotation is not exposed by PyAV.
+    """
+    try:
+        import av
+    except ImportError:
+        return None
+    try:
+        with av.open(path) as container:
+            if not container.streams.video:
+                return None
+            stream = container.streams.video[0]
+            rate = stream.base_rate or stream.average_rate
+            info = {
+                "codec_name": stream.codec_context.name,
+                "width": stream.width,
+                "height": stream.height,
+                "pix_fmt": stream.codec_context.pix_fmt,
+                "r_frame_rate": f"{rate.numerator}/{rate.denominator}" if rate else "0/1",
+            }
+            rotate = stream.metadata.get("rotate")
+            if rotate:
+                info["tags"] = {"rotate": rotate}
+            return info
     except Exception:
         return None
 
 
+def _ffprobe_video_stream(path: Path) -> Optional[dict]:
+    """First video stream's ffprobe fields, cached per file identity (path, mtime, size)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return _ffprobe_video_stream_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _stream_copy_enabled() -> bool:
+    """VIDEO_ENGINE_STREAM_COPY=1 lets matching video segments skip re-encoding."""
+    return os.environ.get("VIDEO_ENGINE_STREAM_COPY", "").strip() == "1"
+
+
+def _can_stream_copy(info: Optional[dict], W: int, H: int, fps: int) -> bool:
+    """True when a source stream already has the segment's codec, size, pixel format and rate.
+
+    Rotated streams never qualify: the re-encode path autorotates, but
+    copied packets would land in MPEG-TS without their display matrix.
+    """
+    if not info:
+        return False
+    try:
+        rate = Fraction(info.get("r_frame_rate", "0/1"))
+        rotation = _stream_rotation(info)
+    except (ValueError, TypeError, ZeroDivisionError):
+        return False
+    return (
+        rotation == 0
+        and info.get("codec_name") == "h264"
+        and info.get("pix_fmt") == "yuv420p"
+        and (info.get("width"), info.get("height")) == (W, H)
+        and rate == int(fps)
+    )
 
 
 def _ffmpeg_filter_cover(W: int, H: int) -> str:
@@ -1190,7 +1993,14 @@ def _ffmpeg_filter_contain(W: int, H: int) -> str:
     return f"scale={W}:{H}:force_original_aspect_ratio=decrease:flags=fast_bilinear"
 
 
-def _ffmpeg_filter_compose_with_blur(W: int, H: int, blur: int, no_upscale: bool = False) -> str:
+def _ffmpeg_filter_compose_with_blur(
+    W: int,
+    H: int,
+    blur: int,
+    no_upscale: bool = False,
+    src: str = "0:v",
+    tag: str = "",
+) -> str:
     bg = _ffmpeg_filter_cover(W, H)
     if blur > 0:
         # Downscale before blur for speed, then scale back up
@@ -1204,10 +2014,10 @@ def _ffmpeg_filter_compose_with_blur(W: int, H: int, blur: int, no_upscale: bool
     else:
         fg = _ffmpeg_filter_contain(W, H)
     return (
-        f"[0:v]split=2[fgsrc][bgsrc];"
-        f"[bgsrc]{bg}[bg];"
-        f"[fgsrc]{fg}[fg];"
-        f"[bg][fg]overlay=(main_w-overlay_w)/2:(main_h-overlay_h)/2"
+        f"[{src}]split=2[fgsrc{tag}][bgsrc{tag}];"
+        f"[bgsrc{tag}]{bg}[bg{tag}];"
+        f"[fgsrc{tag}]{fg}[fg{tag}];"
+        f"[bg{tag}][fg{tag}]overlay=(main_w-overlay_w)/2:(main_h-overlay_h)/2"
     )
 
 
@@ -1233,6 +2043,74 @@ def _ffmpeg_filter_with_fades(
     return base
 
 
+def _photo_runs(plans: list) -> list[range]:
+    """Split plan indices into timeline segments, in order.
+
+    Each run of two or more consecutive photos is one segment; every other
+    plan is a segment of its own.
+    """
+    groups: list[range] = []
+    start = 0
+    while start < len(plans):
+        end = start + 1
+        if getattr(plans[start], "kind", None) == "photo":
+            while end < len(plans) and getattr(plans[end], "kind", None) == "photo":
+                end += 1
+        groups.append(range(start, end))
+        start = end
+    return groups
+
+
+@dataclass
+class _ClipJob:
+    """ffmpeg commands producing one timeline clip (video segment + audio)."""
+
+    idx: int
+    total: int
+    name: str
+    duration: float
+    video_cmd: list[str]
+    out_clip: Path
+    audio_cmd: Optional[list[str]]
+    out_audio: Path
+    cache_path: Optional[Path] = None
+
+
+def _encode_clip(job: _ClipJob) -> Path:
+    """Run the video and audio commands for one clip; return the segment path.
+
+    When job.cache_path exists the segment is linked from the cache instead
+    of being encoded; fresh encodes are linked back into the cache.
+    """
+    if job.cache_path is not None and job.cache_path.exists():
+        print(f"[ffmpeg] Reusing cached clip {job.idx + 1}/{job.total}: {job.name}", flush=True)
+        _link_or_copy(job.cache_path, job.out_clip)
+        try:
+            os.utime(job.cache_path)  # mark as recently used for pruning
+        except OSError:
+            pass
+    else:
+        print(f"[ffmpeg] Rendering clip {job.idx + 1}/{job.total}: {job.name}", flush=True)
+        _run_ffmpeg(job.video_cmd, progress_total_sec=job.duration, progress_label=f"clip {job.idx + 1}/{job.total}")
+        if job.cache_path is not None:
+            _store_in_cache(job.out_clip, job.cache_path)
+    if job.audio_cmd is not None:
+        try:
+            _run_ffmpeg(job.audio_cmd, progress_total_sec=job.duration, progress_label=f"audio {job.idx + 1}/{job.total}")
+        except RuntimeError:
+            # Source without a usable audio stream: keep the track aligned with silence
+            _run_ffmpeg(_build_silence_audio_cmd(job.duration, job.out_audio))
+    return job.out_clip
+
+
+def _encode_clips(jobs: list[_ClipJob], workers: int) -> list[Path]:
+    """Encode clips, in parallel when workers > 1; results keep timeline order."""
+    if workers <= 1 or len(jobs) <= 1:
+        return [_encode_clip(job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(_encode_clip, jobs))
+
+
 def _render_timeline_ffmpeg(
     plans: list,
     output_path: Path,
@@ -1246,6 +2124,9 @@ def _render_timeline_ffmpeg(
     bgm_volume: float = float(DEFAULTS["bgm_volume"]),
     preserve_videos: bool = False,
     resolution: tuple[int, int] | None = None,
+    cache_dir: Optional[Path] = None,
+    encoder_preset: Optional[str] = None,
+    hwaccel: Optional[str] = "auto",
 ) -> None:
     # Determine target resolution (mirror MoviePy path behavior)
     default_W, default_H = 1280, 720
@@ -1256,25 +2137,14 @@ def _render_timeline_ffmpeg(
             target_W, target_H = default_W, default_H
     else:
         if preserve_videos:
-            max_w, max_h = 0, 0
-            for p in plans:
-                if getattr(p, "kind", None) == "video":
-                    size = _ffprobe_size(Path(p.path))
-                    if size:
-                        vw, vh = size
-                        max_w = max(max_w, int(vw or 0))
-                        max_h = max(max_h, int(vh or 0))
-            if max_w > 0 and max_h > 0:
-                target_W, target_H = max_w, max_h
-            else:
-                target_W, target_H = default_W, default_H
+            target_W, target_H = _max_video_display_size(plans) or (default_W, default_H)
         else:
             target_W, target_H = default_W, default_H
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     total_dur = 0.0
-    codec = _select_video_encoder() or "libx264"
+    codec = _resolve_video_encoder(hwaccel) or "libx264"
     filter_scale = _get_filter_scale()
     video_blur_enabled = os.environ.get("VIDEO_ENGINE_VIDEO_BLUR", "").strip() == "1"
     proc_W = max(16, int(target_W * filter_scale))
@@ -1283,12 +2153,32 @@ def _render_timeline_ffmpeg(
         proc_W -= 1
     if proc_H % 2 == 1:
         proc_H -= 1
-    with tempfile.TemporaryDirectory(prefix="ve_ffmpeg_") as tmpdir:
-        clip_paths: list[Path] = []
-        audio_paths: list[Path] = []
+    cache_max_bytes = _get_cache_max_bytes() if cache_dir is not None else 0
+    if cache_max_bytes > 0:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            cache_max_bytes = 0
+    # Photo-only timelines have no source audio: skip per-clip silence and
+    # the audio concat pass, and feed one silent track to the final mux.
+    has_clip_audio = any(getattr(p, "kind", None) == "video" for p in plans)
+    use_bgm = bgm_path is not None and bgm_path.exists() and bgm_path.is_file()
+    # A lone photo without BGM is encoded straight to the output MP4 with a
+    # silent track: no segment, concat or mux pass.
+    direct_output = len(plans) == 1 and not has_clip_audio and not use_bgm
+    # Consecutive photos are rendered by one ffmpeg (concat filter) into a
+    # single segment instead of one process per clip; a photo-only timeline
+    # becomes one segment.
+    groups = _photo_runs(plans)
+    group_of = {i: g for g in groups for i in g}
+    clip_workers = min(_get_clip_parallelism(codec), len(groups))
+    with tempfile.TemporaryDirectory(prefix="ve_ffmpeg_", dir=_fast_tmp()) as tmpdir:
+        jobs: list[_ClipJob] = []
+        run_inputs: list[str] = []
+        run_chains: list[str] = []
+        run_dur = 0.0
 
         for idx, p in enumerate(plans):
-            print(f"[ffmpeg] Rendering clip {idx + 1}/{len(plans)}: {Path(p.path).name}", flush=True)
             path = Path(p.path)
             if not path.exists() or not path.is_file():
                 raise FileNotFoundError(f"Clip not found: {path}")
@@ -1319,6 +2209,8 @@ def _render_timeline_ffmpeg(
 
             kind = getattr(p, "kind", None)
             use_video_blur = bool(kind == "video" and video_blur_enabled)
+            group = group_of[idx]
+            run_pos = idx - group.start if len(group) > 1 else None
 
             # Use compose_with_blur only for photos or when explicitly enabled for videos
             # Otherwise use cover filter for faster processing
@@ -1328,7 +2220,12 @@ def _render_timeline_ffmpeg(
                     no_upscale = True
                 elif is_source_portrait:
                     no_upscale = True
-                base_filter = _ffmpeg_filter_compose_with_blur(proc_W, proc_H, blur_eff, no_upscale=no_upscale)
+                if run_pos is not None:
+                    base_filter = _ffmpeg_filter_compose_with_blur(
+                        proc_W, proc_H, blur_eff, no_upscale=no_upscale, src=f"{run_pos}:v", tag=str(run_pos)
+                    )
+                else:
+                    base_filter = _ffmpeg_filter_compose_with_blur(proc_W, proc_H, blur_eff, no_upscale=no_upscale)
             else:
                 base_filter = _ffmpeg_filter_cover(proc_W, proc_H)
 
@@ -1346,36 +2243,98 @@ def _render_timeline_ffmpeg(
             if (proc_W, proc_H) != (target_W, target_H):
                 vf = f"{vf},scale={target_W}:{target_H}:flags=fast_bilinear"
 
-            out_clip = Path(tmpdir) / f"clip_{idx:04d}.mp4"
+            if run_pos is not None:
+                raster_path = _ensure_raster_photo(staged_path, tmpdir, idx, cover=(proc_W, proc_H))
+                run_inputs += [
+                    "-loop", "1", "-framerate", str(int(fps)), "-t", str(use_dur),
+                    "-thread_queue_size", "512", "-i", str(raster_path),
+                ]
+                if not vf.startswith("["):
+                    vf = f"[{run_pos}:v]{vf}"
+                # concat needs identical size/SAR on every segment
+                run_chains.append(f"{vf},setsar=1[v{run_pos}]")
+                run_dur += use_dur
+                if idx != group[-1]:
+                    continue
+
+                n = len(group)
+                out_clip = Path(tmpdir) / f"photos_{group.start:04d}.ts"
+                graph = ";".join(run_chains) + ";" + "".join(f"[v{i}]" for i in range(n))
+                graph += f"concat=n={n}:v=1:a=0"
+                cmd = [_ffmpeg_exe(), "-y", *run_inputs] + _build_base_cmd(graph, run_dur, fps, codec)[2:]
+                cmd.insert(cmd.index("-pix_fmt"), "-an")
+                insert_pos = cmd.index("-pix_fmt")
+                run_encoder_args = (
+                    _get_ffmpeg_encoder_args(codec, encoder_preset)
+                    + _encoder_thread_args(codec, clip_workers)
+                    + _still_tune_args(codec)
+                )
+                for arg in reversed(run_encoder_args):
+                    cmd.insert(insert_pos, arg)
+                cmd.extend(_sw_profile_args(codec))
+                cmd.extend(_ts_segment_args(codec, out_clip))
+                out_audio = Path(tmpdir) / f"audio_{group.start:04d}.wav"
+                audio_cmd = _build_silence_audio_cmd(run_dur, out_audio) if has_clip_audio else None
+                cache_path = None
+                if cache_max_bytes > 0:
+                    sources = [Path(plans[i].path) for i in group]
+                    cache_path = cache_dir / f"{_clip_cache_key(sources, cmd, tmpdir)}.ts"
+                jobs.append(_ClipJob(len(jobs), len(groups), f"{n} photos", run_dur, cmd, out_clip, audio_cmd, out_audio, cache_path))
+                run_inputs, run_chains, run_dur = [], [], 0.0
+                continue
+
+            # MPEG-TS segments can be joined byte-wise via the concat protocol
+            out_clip = Path(tmpdir) / f"clip_{idx:04d}.ts"
+
+            # Unfiltered video already in the output format: copy packets
+            copy_video = (
+                kind == "video"
+                and not direct_output
+                and _stream_copy_enabled()
+                and vf == _ffmpeg_filter_cover(target_W, target_H)
+                and _can_stream_copy(_ffprobe_video_stream(staged_path), target_W, target_H, fps)
+            )
             
             # Build base command (video-only for speed)
-            base_cmd = _build_base_cmd(vf, use_dur, fps)
-            base_cmd.insert(base_cmd.index("-pix_fmt"), "-an")
+            base_cmd = _build_base_cmd(vf, use_dur, fps, codec)
+            if not direct_output:
+                base_cmd.insert(base_cmd.index("-pix_fmt"), "-an")
             
             # Add encoder-specific arguments
-            encoder_args = _get_ffmpeg_encoder_args(codec)
+            encoder_args = _get_ffmpeg_encoder_args(codec, encoder_preset) + _encoder_thread_args(codec, clip_workers)
+            if kind == "photo":
+                encoder_args += _still_tune_args(codec)
             
             # Add codec-independent options if not using hardware encoding
-            if codec and "nvenc" not in codec and "qsv" not in codec and "amf" not in codec and "videotoolbox" not in codec:
-                base_cmd.extend(["-profile:v", "main", "-level", "4.1"])
-            
-            base_cmd.extend(["-movflags", "+faststart", str(out_clip)])
+            base_cmd.extend(_sw_profile_args(codec))
+            if direct_output:
+                base_cmd.extend([
+                    "-map", "1:a:0",
+                    "-c:a", "aac",
+                    "-q:a", "8",
+                    "-movflags", _final_movflags(),
+                    str(output_path),
+                ])
+            else:
+                base_cmd.extend(_ts_segment_args(codec, out_clip))
 
             # kind already resolved above
             if kind == "photo":
-                raster_path = _ensure_raster_photo(staged_path, tmpdir, idx)
+                raster_path = _ensure_raster_photo(staged_path, tmpdir, idx, cover=(proc_W, proc_H))
                 if raster_path.suffix.lower() in (".heic", ".heif") and _ffmpeg_supports_heif():
-                    photo_input = ["-loop", "1", "-framerate", str(int(fps)), "-i", str(raster_path)]
+                    photo_input = ["-loop", "1", "-framerate", str(int(fps)), "-thread_queue_size", "512", "-i", str(raster_path)]
                 else:
-                    photo_input = ["-loop", "1", "-framerate", str(int(fps)), "-i", str(raster_path)]
+                    photo_input = ["-loop", "1", "-framerate", str(int(fps)), "-thread_queue_size", "512", "-i", str(raster_path)]
+                if direct_output:
+                    photo_input += _silence_audio_input(use_dur)
                 cmd = [
-                    "ffmpeg", "-y",
+                    _ffmpeg_exe(), "-y",
                     *photo_input,
                 ] + base_cmd[1:]
             else:
-                video_input_opts = _build_video_input_opts()
+                video_input_opts = _build_video_input_opts(codec)
                 cmd = [
-                    "ffmpeg", "-y",
+                    _ffmpeg_exe(), "-y",
                     *video_input_opts,
                     "-i", str(staged_path),
                 ] + base_cmd[1:]
@@ -1385,44 +2344,53 @@ def _render_timeline_ffmpeg(
             for arg in reversed(encoder_args):
                 cmd.insert(insert_pos, arg)
 
-            _run_ffmpeg(cmd, progress_total_sec=use_dur, progress_label=f"clip {idx + 1}/{len(plans)}")
-            clip_paths.append(out_clip)
+            if copy_video:
+                cmd = [
+                    _ffmpeg_exe(), "-y",
+                    "-i", str(staged_path),
+                    "-t", str(use_dur),
+                    "-map", "0:v:0",
+                    "-an",
+                    "-c:v", "copy",
+                    *_ts_segment_args("h264", out_clip),
+                ]
+
+            if direct_output:
+                print(f"[ffmpeg] Rendering clip 1/1: {path.name}", flush=True)
+                _run_ffmpeg(cmd, progress_total_sec=use_dur, progress_label="clip 1/1")
+                return
+
             # Extract audio separately
             out_audio = Path(tmpdir) / f"audio_{idx:04d}.wav"
-            if kind == "video":
+            if not has_clip_audio:
+                audio_cmd = None
+            elif kind == "video":
                 audio_cmd = _build_audio_extract_cmd(staged_path, use_dur, out_audio)
             else:
                 audio_cmd = _build_silence_audio_cmd(use_dur, out_audio)
-            _run_ffmpeg(audio_cmd, progress_total_sec=use_dur, progress_label=f"audio {idx + 1}/{len(plans)}")
-            audio_paths.append(out_audio)
-
-        # Concatenate clips
-        print("[ffmpeg] Concatenating clips...", flush=True)
-        list_path = Path(tmpdir) / "concat.txt"
-        _write_concat_list(clip_paths, list_path)
-
-        concat_out = Path(tmpdir) / "concat.mp4"
-        concat_cmd = [
-            "ffmpeg", "-y",
-            "-f", "concat", "-safe", "0",
-            "-protocol_whitelist", "file,pipe",
-            "-i", str(list_path),
-            "-c", "copy",
-            "-max_muxing_queue_size", "1024",
-            "-fflags", "+genpts",
-            str(concat_out),
-        ]
-        _run_ffmpeg(concat_cmd, progress_total_sec=total_dur, progress_label="concat")
-
+            cache_path = None
+            if cache_max_bytes > 0:
+                cache_path = cache_dir / f"{_clip_cache_key(path, cmd, tmpdir)}.ts"
+            jobs.append(_ClipJob(len(jobs), len(groups), path.name, use_dur, cmd, out_clip, audio_cmd, out_audio, cache_path))
+
+        # Clips are independent; encode them concurrently and concat in order
+        clip_paths = _encode_clips(jobs, clip_workers)
+        audio_paths = [job.out_audio for job in jobs]
+        if cache_max_bytes > 0:
+            _prune_clip_cache(cache_dir, cache_max_bytes)
+
+        # Video segments are joined by the final mux itself (concat: input)
         # Concatenate audio clips
-        audio_list_path = Path(tmpdir) / "audio_concat.txt"
-        _write_concat_list(audio_paths, audio_list_path)
-        audio_concat = Path(tmpdir) / "audio_concat.wav"
-        audio_concat_cmd = _build_audio_concat_cmd(audio_list_path, audio_concat)
-        _run_ffmpeg(audio_concat_cmd, progress_total_sec=total_dur, progress_label="audio-concat")
+        audio_concat: Optional[Path] = None
+        if has_clip_audio:
+            audio_list_path = Path(tmpdir) / "audio_concat.txt"
+            _write_concat_list(audio_paths, audio_list_path)
+            audio_concat = Path(tmpdir) / "audio_concat.wav"
+            audio_concat_cmd = _build_audio_concat_cmd(audio_list_path, audio_concat)
+            _run_ffmpeg(audio_concat_cmd, progress_total_sec=total_dur, progress_label="audio-concat")
 
         # Add BGM if requested
-        if bgm_path is not None and bgm_path.exists() and bgm_path.is_file():
+        if use_bgm:
             print("[ffmpeg] Mixing BGM...", flush=True)
             max_fade = float(total_dur) / 2.0 if total_dur > 0 else 0.0
             fi = min(float(fade_in), max_fade)
@@ -1459,7 +2427,7 @@ def _render_timeline_ffmpeg(
             final_audio = "[out_audio]"
 
             audio_cmd = _build_bgm_mix_cmd(
-                concat_out,
+                clip_paths,
                 audio_concat,
                 bgm_path,
                 total_dur,
@@ -1469,6 +2437,6 @@ def _render_timeline_ffmpeg(
             _run_ffmpeg(audio_cmd, progress_total_sec=total_dur, progress_label="bgm")
         else:
             print("[ffmpeg] Writing output...", flush=True)
-            mux_cmd = _build_mux_cmd(concat_out, audio_concat, total_dur, output_path)
+            mux_cmd = _build_mux_cmd(clip_paths, audio_concat, total_dur, output_path)
             _run_ffmpeg(mux_cmd, progress_total_sec=total_dur, progress_label="mux")
 
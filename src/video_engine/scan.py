@@ -8,6 +8,8 @@ robust for OneDrive-synced folders where mtime may be unreliable.
 from __future__ import annotations
 
 import logging
+import os
+import stat
 from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, date
@@ -146,36 +148,70 @@ def suggest_input_paths(path: Path, limit: int = 5) -> List[Path]:
     return candidates[:limit]
 
 
+def choose_bgm(bgm_path: Path | None) -> Path | None:
+    """Resolve the BGM option to a single audio file.
+
+    A file is returned as-is; for a directory the lexicographically first
+    file is picked. Returns None when nothing usable is found.
+    """
+    if bgm_path is None:
+        return None
+    # One stat answers both "file?" and "directory?"
+    try:
+        st = os.stat(bgm_path)
+    except OSError:
+        return None
+    if stat.S_ISREG(st.st_mode):
+        return bgm_path
+    if stat.S_ISDIR(st.st_mode):
+        # Single pass for the first name; DirEntry.is_file() reuses the type
+        # info from the directory listing instead of issuing a stat per entry.
+        best = None
+        with os.scandir(bgm_path) as it:
+            for e in it:
+                if e.is_file() and (best is None or e.name < best.name):
+                    best = e
+        return Path(best.path) if best else None
+    return None
+
+
 def _scan_paths(
-    paths: Iterable[Path],
+    paths: Iterable[Path | os.DirEntry],
     sample_limit: int = 20,
 ) -> tuple[List[MediaItem], Counter[ExclusionReason], int]:
+    """Classify entries and collect media items.
+
+    Each entry is stat'ed once; the result serves the directory/file check,
+    the zero-byte check and the mtime fallback. `os.DirEntry` values (flat
+    scan) reuse the information cached by `os.scandir`.
+    """
     items: List[MediaItem] = []
     excluded: Counter[ExclusionReason] = Counter()
     found_files = 0
 
-    for p in paths:
+    for entry in paths:
         try:
-            if p.is_dir():
-                excluded[ExclusionReason.directory] += 1
-                continue
-            if not p.is_file():
-                excluded[ExclusionReason.not_file] += 1
-                continue
+            st = entry.stat()
+        except FileNotFoundError:
+            # Dangling symlink: neither a directory nor a regular file
+            excluded[ExclusionReason.not_file] += 1
+            continue
         except Exception:
             excluded[ExclusionReason.unreadable] += 1
             continue
+        if stat.S_ISDIR(st.st_mode):
+            excluded[ExclusionReason.directory] += 1
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            excluded[ExclusionReason.not_file] += 1
+            continue
 
         found_files += 1
-        try:
-            if p.stat().st_size == 0:
-                excluded[ExclusionReason.zero_byte] += 1
-                continue
-        except Exception:
-            excluded[ExclusionReason.unreadable] += 1
+        if st.st_size == 0:
+            excluded[ExclusionReason.zero_byte] += 1
             continue
 
-        ext = p.suffix.lower()
+        ext = os.path.splitext(entry.name)[1].lower()
         kind: Literal["photo", "video"] | None = None
         if ext in PHOTO_EXTS:
             kind = "photo"
@@ -185,13 +221,14 @@ def _scan_paths(
             excluded[ExclusionReason.extension] += 1
             continue
 
+        p = Path(entry)
         ts: datetime | None = None
         if kind == "photo":
             ts = _read_photo_exif_timestamp(p)
             if ts is None:
                 logger.debug("No EXIF timestamp for %s; fallback to mtime", p)
         if ts is None:
-            ts = _file_mtime_timestamp(p)
+            ts = datetime.fromtimestamp(st.st_mtime)
 
         items.append(MediaItem(path=p, kind=kind, timestamp=ts))
 
@@ -227,7 +264,8 @@ def scan_media_with_report(
     if scan_all:
         items, excluded, found_files = _scan_paths(normalized.rglob("*"), sample_limit=sample_limit)
     else:
-        items, excluded, found_files = _scan_paths(normalized.iterdir(), sample_limit=sample_limit)
+        with os.scandir(normalized) as it:
+            items, excluded, found_files = _scan_paths(it, sample_limit=sample_limit)
 
     sample_items = items[:sample_limit] if sample_limit > 0 else []
     report = ScanReport(
@@ -4,17 +4,20 @@ from __future__ import annotations
 
 import re
 from datetime import date, datetime
+from functools import lru_cache
 from typing import Tuple
 
 _ISO_WEEK_RE = re.compile(r"^(\d{4})-W(0[1-9]|[1-4][0-9]|5[0-3])$")
 
 
+@lru_cache(maxsize=256)
 def iso_week_to_range(iso_week: str) -> Tuple[date, date]:
     """Convert an ISO week string to a (start_date, end_date) tuple.
 
     The input must be strictly formatted as ``YYYY-Www`` where ``ww`` is
     two digits from 01 to 53. The returned dates are the Monday (start)
-    and Sunday (end) of that ISO week.
+    and Sunday (end) of that ISO week. Results are memoized (the returned
+    tuple of dates is immutable).
 
     Raises
     -----
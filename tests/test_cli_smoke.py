@@ -73,4 +73,16 @@ def test_cli_accepts_timeline_options(tmp_path: Path) -> None:
             "--print-config",
         ]
     )
-    assert rc == 0
\ No newline at end of file
+    assert rc == 0
+
+
+def test_print_config_json_format(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    import json
+
+    rc = cli.main(["--print-config", "--config-format", "json", "--dry-run", "--input", str(tmp_path), "--fps", "24"])
+    assert rc == 0
+
+    first_line = capsys.readouterr().out.splitlines()[0]
+    printed = json.loads(first_line)
+    assert printed["fps"] == 24
+    assert printed["input"] == str(tmp_path)
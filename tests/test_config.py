@@ -2,11 +2,14 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
+
 from video_engine.config import (
     build_config_defaults,
     build_effective_config,
     format_effective_config,
     load_yaml_config,
+    parse_resolution_str,
 )
 
 
@@ -19,12 +22,29 @@ def test_load_yaml_config_resolves_paths(tmp_path: Path) -> None:
         encoding="utf-8",
     )
 
-    data = load_yaml_config(cfg)
+    data = load_yaml_config(cfg, resolve_paths=True)
 
     assert data["input"] == (config_dir / "media").resolve(strict=False)
     assert data["output"] == (config_dir / "../out").resolve(strict=False)
     assert data["bgm"] == (config_dir / "bgm").resolve(strict=False)
 
+    # Default: joined to the config directory without canonicalization
+    data = load_yaml_config(cfg)
+    assert data["input"] == config_dir / "media"
+    assert data["output"] == config_dir / "../out"
+
+
+def test_load_yaml_config_cache_tracks_file_changes(tmp_path: Path) -> None:
+    cfg = tmp_path / "settings.yml"
+    cfg.write_text("duration: 30\n", encoding="utf-8")
+
+    first = load_yaml_config(cfg)
+    first["duration"] = 999.0  # mutating the result must not leak into the cache
+    assert load_yaml_config(cfg)["duration"] == 30.0
+
+    cfg.write_text("duration: 45.5\n", encoding="utf-8")
+    assert load_yaml_config(cfg)["duration"] == 45.5
+
 
 def test_config_precedence() -> None:
     base = build_config_defaults()
@@ -49,8 +69,29 @@ def test_config_precedence() -> None:
     assert effective["resolution"] == (1920, 1080)
 
 
+def test_build_effective_config_returns_fresh_dict() -> None:
+    base = build_config_defaults()
+    cli_values = {"duration": 12.0}
+
+    first = build_effective_config(base, "preview", {}, cli_values, {"duration"})
+    first["duration"] = 99.0
+    second = build_effective_config(base, "preview", {}, cli_values, {"duration"})
+
+    assert second["duration"] == 12.0
+    assert second["resolution"] == (1280, 720)
+    assert base["resolution"] is None
+
+
 def test_format_effective_config_resolution() -> None:
     effective = build_config_defaults()
     effective["resolution"] = (1920, 1080)
     printable = format_effective_config(effective)
     assert printable["resolution"] == "1920x1080"
+
+
+def test_parse_resolution_str_validates_format_and_range() -> None:
+    assert parse_resolution_str("1920x1080") == (1920, 1080)
+    with pytest.raises(ValueError, match="WIDTHxHEIGHT"):
+        parse_resolution_str("1920*1080")
+    with pytest.raises(ValueError, match="out of supported range"):
+        parse_resolution_str("100x100")
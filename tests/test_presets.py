@@ -1,4 +1,4 @@
-from video_engine.presets import build_base_config, detect_provided_options, merge_preset
+from video_engine.presets import build_base_config, merge_preset
 
 
 def test_no_preset_keeps_base():
@@ -69,13 +69,6 @@ def test_bgm_volume_defaults_and_overrides():
     assert eff["bgm_volume"] == 25.0
 
 
-def test_detect_provided_options_includes_bgm_volume():
-    argv = ["--bgm-volume", "15", "--duration", "60"]
-    provided = detect_provided_options(argv)
-    assert "bgm_volume" in provided
-    assert "duration" in provided
-
-
 def test_build_base_config_defaults():
     base = build_base_config()
     assert base["duration"] == 8.0
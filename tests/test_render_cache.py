@@ -0,0 +1,103 @@
+"""Tests for the per-clip encode cache and encoder-probe cache helpers in `video_engine.render`."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from video_engine.render import _clip_cache_key, _prune_clip_cache, _store_in_cache
+
+
+def test_cache_key_ignores_temp_paths(tmp_path: Path) -> None:
+    src = tmp_path / "a.jpg"
+    src.write_bytes(b"data")
+    cmd_a = ["ffmpeg", "-i", str(src), "-r", "30", "/tmp/ve_ffmpeg_a/clip_0000.ts"]
+    cmd_b = ["ffmpeg", "-i", str(src), "-r", "30", "/tmp/ve_ffmpeg_b/clip_0000.ts"]
+    assert _clip_cache_key(src, cmd_a, "/tmp/ve_ffmpeg_a") == _clip_cache_key(src, cmd_b, "/tmp/ve_ffmpeg_b")
+
+
+def test_cache_key_changes_with_options_and_source(tmp_path: Path) -> None:
+    src = tmp_path / "a.jpg"
+    src.write_bytes(b"data")
+    cmd = ["ffmpeg", "-i", str(src), "-r", "30"]
+    key = _clip_cache_key(src, cmd, "/tmp/x")
+    assert key != _clip_cache_key(src, ["ffmpeg", "-i", str(src), "-r", "24"], "/tmp/x")
+    src.write_bytes(b"changed data")
+    assert key != _clip_cache_key(src, cmd, "/tmp/x")
+
+
+def test_cache_key_ignores_encoder_thread_count(tmp_path: Path, monkeypatch) -> None:
+    from video_engine import render
+
+    src = tmp_path / "a.jpg"
+    src.write_bytes(b"data")
+    monkeypatch.setattr(render.os, "cpu_count", lambda: 8)
+    keys = {
+        _clip_cache_key(src, ["ffmpeg", "-i", str(src), *render._encoder_thread_args("libx264", workers), "-r", "30"], "/tmp/x")
+        for workers in (1, 2, 4)
+    }
+    assert len(keys) == 1
+
+
+def test_prune_removes_least_recently_used(tmp_path: Path) -> None:
+    for i, name in enumerate(["old.ts", "mid.ts", "new.ts"]):
+        f = tmp_path / name
+        f.write_bytes(b"x" * 100)
+        os.utime(f, (1000 + i, 1000 + i))
+    _prune_clip_cache(tmp_path, 250)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["mid.ts", "new.ts"]
+
+
+def test_store_in_cache_leaves_no_partial_entry(tmp_path: Path, monkeypatch) -> None:
+    from video_engine import render
+
+    src = tmp_path / "clip.ts"
+    src.write_bytes(b"x" * 100)
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+
+    def failing_copy(a, b):
+        Path(b).write_bytes(b"x" * 10)  # truncated write, then the disk fills up
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(render.os, "link", failing_copy)
+    monkeypatch.setattr(render.shutil, "copy2", failing_copy)
+    _store_in_cache(src, cache_dir / "key.ts")
+    assert list(cache_dir.iterdir()) == []
+
+    monkeypatch.undo()
+    _store_in_cache(src, cache_dir / "key.ts")
+    assert [p.name for p in cache_dir.iterdir()] == ["key.ts"]
+    assert (cache_dir / "key.ts").read_bytes() == src.read_bytes()
+
+
+_ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+
+def test_detect_encoders_caches_probe(tmp_path: Path, monkeypatch) -> None:
+    import subprocess
+
+    from video_engine import render
+
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_bytes(b"binary")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout=_ENCODERS_OUTPUT, stderr="")
+
+    monkeypatch.setattr(render.subprocess, "run", fake_run)
+    first = render.detect_encoders(str(ffmpeg))
+    second = render.detect_encoders(str(ffmpeg))
+    assert first == second == {"hw": ["h264_nvenc"], "sw": ["libx264"]}
+    assert len(calls) == 1
+    assert (tmp_path / "cache" / "video_engine" / "encoders.json").exists()
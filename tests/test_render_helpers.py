@@ -0,0 +1,163 @@
+"""Tests for encoder selection, probing and composition helpers in `video_engine.render`."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+def test_ffmpeg_exe_falls_back_to_bundled_binary(monkeypatch) -> None:
+    from video_engine import render
+
+    monkeypatch.setattr(render.shutil, "which", lambda name: None)
+    monkeypatch.setattr(render, "_bundled_ffmpeg_exe", lambda: "/opt/bundled/ffmpeg")
+    assert render._ffmpeg_exe() == "/opt/bundled/ffmpeg"
+    assert render._ffmpeg_available()
+    monkeypatch.setattr(render.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+    assert render._ffmpeg_exe() == "/usr/bin/ffmpeg"
+
+
+def test_moviepy_encoder_kwargs_match_ffmpeg_tuning(monkeypatch) -> None:
+    from video_engine.render import _moviepy_encoder_kwargs
+
+    monkeypatch.delenv("VIDEO_ENGINE_FFMPEG_PRESET", raising=False)
+    monkeypatch.delenv("VIDEO_ENGINE_NVENC_MODE", raising=False)
+    sw = _moviepy_encoder_kwargs(None)
+    assert sw["codec"] == "libx264" and sw["preset"] == "fast"
+    assert sw["ffmpeg_params"][:2] == ["-crf", "28"]
+    hw = _moviepy_encoder_kwargs("h264_nvenc")
+    assert hw["preset"] == "p1"
+    assert "-preset" not in hw["ffmpeg_params"] and "-c:v" not in hw["ffmpeg_params"]
+    assert hw["ffmpeg_params"][:2] == ["-tune", "ll"]
+    still = _moviepy_encoder_kwargs(None, tune="stillimage")["ffmpeg_params"]
+    assert still[still.index("-tune") + 1] == "stillimage"
+    assert _moviepy_encoder_kwargs("h264_nvenc", tune="stillimage")["ffmpeg_params"].count("-tune") == 1
+    assert sw["threads"] >= 1 and "threads" not in hw
+    assert sw["ffmpeg_params"][sw["ffmpeg_params"].index("-pix_fmt") + 1] == "yuv420p"
+    assert hw["ffmpeg_params"][hw["ffmpeg_params"].index("-pix_fmt") + 1] == "nv12"
+    assert "-profile:v" in sw["ffmpeg_params"] and "-profile:v" not in hw["ffmpeg_params"]
+
+
+def test_encoder_thread_args_split_cpus(monkeypatch) -> None:
+    from video_engine import render
+
+    monkeypatch.setattr(render.os, "cpu_count", lambda: 8)
+    assert render._encoder_thread_args("libx264", 1) == []
+    assert render._encoder_thread_args("libx264", 4) == ["-threads", "2"]
+    assert render._encoder_thread_args("libx264", 16) == ["-threads", "1"]
+    assert render._encoder_thread_args("h264_nvenc", 4) == []
+
+
+def test_can_stream_copy_requires_matching_stream() -> None:
+    from video_engine.render import _can_stream_copy
+
+    info = {"codec_name": "h264", "pix_fmt": "yuv420p", "width": 1280, "height": 720, "r_frame_rate": "30/1"}
+    assert _can_stream_copy(info, 1280, 720, 30)
+    assert not _can_stream_copy(info, 1920, 1080, 30)
+    assert not _can_stream_copy({**info, "r_frame_rate": "30000/1001"}, 1280, 720, 30)
+    assert not _can_stream_copy({**info, "codec_name": "hevc"}, 1280, 720, 30)
+    assert not _can_stream_copy(None, 1280, 720, 30)
+    # Copied packets lose the display matrix, so rotated sources must re-encode
+    assert not _can_stream_copy({**info, "tags": {"rotate": "180"}}, 1280, 720, 30)
+    assert not _can_stream_copy({**info, "side_data_list": [{"rotation": -90}]}, 1280, 720, 30)
+
+
+def test_encoder_preset_threads_into_x264_args(monkeypatch) -> None:
+    from video_engine.render import _get_ffmpeg_encoder_args
+
+    monkeypatch.delenv("VIDEO_ENGINE_FFMPEG_PRESET", raising=False)
+    assert _get_ffmpeg_encoder_args("libx264", "ultrafast")[2:4] == ["-preset", "ultrafast"]
+    assert _get_ffmpeg_encoder_args("libx264")[2:4] == ["-preset", "fast"]
+    monkeypatch.setenv("VIDEO_ENGINE_FFMPEG_PRESET", "veryfast")
+    assert _get_ffmpeg_encoder_args("libx264", "ultrafast")[2:4] == ["-preset", "veryfast"]
+
+
+def test_photo_runs_group_consecutive_photos() -> None:
+    from types import SimpleNamespace
+
+    from video_engine.render import _photo_runs
+
+    kinds = ["photo", "photo", "video", "photo", "video", "photo", "photo", "photo"]
+    plans = [SimpleNamespace(kind=k) for k in kinds]
+    assert _photo_runs(plans) == [range(0, 2), range(2, 3), range(3, 4), range(4, 5), range(5, 8)]
+    assert _photo_runs(plans[:2]) == [range(0, 2)]
+
+
+def test_select_video_encoder_skips_unusable_hw(monkeypatch) -> None:
+    import subprocess
+
+    from video_engine import render
+
+    monkeypatch.delenv("VIDEO_ENGINE_FFMPEG_CODEC", raising=False)
+    monkeypatch.delenv("VIDEO_ENGINE_ENABLE_HW", raising=False)
+    monkeypatch.setattr(render.os, "name", "posix")
+    monkeypatch.setattr(render.sys, "platform", "linux")
+    monkeypatch.setattr(render, "_ffmpeg_exe", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(render, "detect_encoders", lambda path: {"hw": ["h264_nvenc", "h264_qsv"], "sw": ["libx264"]})
+
+    def fake_run(cmd, **kwargs):
+        rc = 1 if "h264_nvenc" in cmd else 0
+        return subprocess.CompletedProcess(cmd, rc, stdout=b"", stderr=b"")
+
+    monkeypatch.setattr(render.subprocess, "run", fake_run)
+    render._select_video_encoder.cache_clear()
+    try:
+        assert render._select_video_encoder() == "h264_qsv"
+    finally:
+        render._select_video_encoder.cache_clear()
+
+
+def test_blurred_cover_background_fills_canvas() -> None:
+    Image = pytest.importorskip("PIL.Image")
+    from video_engine.render import _blurred_cover_background
+
+    img = Image.new("RGB", (400, 300), (200, 10, 10))
+    for W, H, r in [(160, 90, 4), (90, 160, 0)]:
+        arr = _blurred_cover_background(img, W, H, r)
+        assert arr.shape == (H, W, 3)
+        assert tuple(arr[H // 2, W // 2]) == (200, 10, 10)
+
+
+def test_ffprobe_size_applies_rotation(monkeypatch) -> None:
+    from video_engine import render
+
+    infos = {
+        "plain.mp4": {"width": 1920, "height": 1080},
+        "tag.mp4": {"width": 1920, "height": 1080, "tags": {"rotate": "90"}},
+        "matrix.mov": {"width": 1920, "height": 1080, "side_data_list": [{"rotation": -90}]},
+    }
+    monkeypatch.setattr(render, "_ffprobe_video_stream", lambda path: infos.get(path.name))
+    assert render._ffprobe_size(Path("plain.mp4")) == (1920, 1080)
+    assert render._ffprobe_size(Path("tag.mp4")) == (1080, 1920)
+    assert render._ffprobe_size(Path("matrix.mov")) == (1080, 1920)
+    assert render._ffprobe_size(Path("missing.mp4")) is None
+
+
+def test_resolve_video_encoder_hwaccel_values(monkeypatch) -> None:
+    from video_engine import render
+
+    monkeypatch.setattr(render, "_select_video_encoder", lambda: "h264_nvenc")
+    assert render._resolve_video_encoder("auto") == "h264_nvenc"
+    assert render._resolve_video_encoder("none") is None
+    assert render._resolve_video_encoder(None) is None
+    assert render._resolve_video_encoder("h264_qsv") == "h264_qsv"
+
+
+def test_preserve_videos_canvas_uses_display_orientation(monkeypatch) -> None:
+    from types import SimpleNamespace
+
+    from video_engine import render
+
+    infos = {
+        "portrait.mov": {"width": 1920, "height": 1080, "side_data_list": [{"rotation": -90}]},
+        "landscape.mp4": {"width": 1280, "height": 720},
+    }
+    monkeypatch.setattr(render, "_ffprobe_video_stream", lambda path: infos.get(path.name))
+    portrait = SimpleNamespace(path=Path("portrait.mov"), kind="video", duration=3.0)
+    landscape = SimpleNamespace(path=Path("landscape.mp4"), kind="video", duration=3.0)
+    photo = SimpleNamespace(path=Path("a.jpg"), kind="photo", duration=2.0)
+    # A rotate=90 phone clip coded 1920x1080 yields a portrait canvas
+    assert render._max_video_display_size([portrait, photo]) == (1080, 1920)
+    assert render._max_video_display_size([portrait, landscape]) == (1280, 1920)
+    assert render._max_video_display_size([photo]) is None
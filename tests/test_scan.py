@@ -12,6 +12,7 @@ import pytest
 from video_engine.scan import (
     ExclusionReason,
     MediaItem,
+    choose_bgm,
     normalize_input_path,
     scan_media_with_report,
     scan_week,
@@ -185,3 +186,16 @@ def test_scan_report_suggests_paths(tmp_path: Path) -> None:
 
     assert report.input_exists is False
     assert report.suggestions
+
+
+def test_choose_bgm_picks_first_file(tmp_path: Path) -> None:
+    bgm_dir = tmp_path / "bgm"
+    bgm_dir.mkdir()
+    (bgm_dir / "b.mp3").write_bytes(b"x")
+    (bgm_dir / "a.mp3").write_bytes(b"x")
+    (bgm_dir / "0_subdir").mkdir()
+
+    assert choose_bgm(bgm_dir) == bgm_dir / "a.mp3"
+    assert choose_bgm(bgm_dir / "b.mp3") == bgm_dir / "b.mp3"
+    assert choose_bgm(tmp_path / "missing") is None
+    assert choose_bgm(None) is None